@@ -43,12 +43,16 @@ cat > lambda-policy.json << EOF
                 "dynamodb:UpdateItem",
                 "dynamodb:DeleteItem",
                 "dynamodb:Query",
-                "dynamodb:Scan"
+                "dynamodb:Scan",
+                "dynamodb:BatchGetItem",
+                "dynamodb:BatchWriteItem"
             ],
             "Resource": [
                 "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/Users",
+                "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/Users/index/*",
                 "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/Trips",
                 "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/TripStates",
+                "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/EtaLegCache",
                 "arn:aws:dynamodb:${REGION}:${ACCOUNT_ID}:table/Trips/index/*"
             ]
         },
@@ -73,7 +77,8 @@ cat > lambda-policy.json << EOF
         {
             "Effect": "Allow",
             "Action": [
-                "bedrock:InvokeModel"
+                "bedrock:InvokeModel",
+                "bedrock:InvokeModelWithResponseStream"
             ],
             "Resource": "*"
         },
@@ -6,13 +6,25 @@
 set -e
 
 if [ $# -eq 0 ]; then
-    echo "Usage: $0 <handler_name>"
+    echo "Usage: $0 <handler_name> [entry_point]"
     echo "Available handlers: health, auth, init, classify, eta, plan, save, get_trip"
+    echo "The auth package has one function per route: signup_handler, login_handler"
     exit 1
 fi
 
 HANDLER_NAME=$1
+if [ "$HANDLER_NAME" = "auth" ] && [ $# -lt 2 ]; then
+    # The auth package has no lambda_handler dispatcher; each route is its own function
+    echo "Error: the auth package needs an entry point: signup_handler or login_handler"
+    echo "Usage: $0 auth <signup_handler|login_handler>"
+    exit 1
+fi
+ENTRY_POINT=${2:-lambda_handler}
 FUNCTION_NAME="odessey-$HANDLER_NAME"
+if [ $# -ge 2 ]; then
+    # e.g. "auth signup_handler" -> odessey-auth-signup
+    FUNCTION_NAME="$FUNCTION_NAME-${ENTRY_POINT%_handler}"
+fi
 REGION=${AWS_REGION:-us-east-2}
 ROLE_NAME="lambda-execution-role"
 PACKAGE_FILE="deploy/packages/${HANDLER_NAME}-lambda.zip"
@@ -42,24 +54,28 @@ if aws lambda get-function --function-name "$FUNCTION_NAME" --region "$REGION" >
     aws lambda update-function-code \
         --function-name "$FUNCTION_NAME" \
         --zip-file "fileb://$PACKAGE_FILE" \
+        --architectures arm64 \
         --region "$REGION"
     
     echo "Updating function configuration..."
     aws lambda update-function-configuration \
         --function-name "$FUNCTION_NAME" \
+        --runtime python3.12 \
+        --handler "handler.$ENTRY_POINT" \
         --timeout 30 \
-        --memory-size 512 \
+        --memory-size 1024 \
         --region "$REGION"
 else
     echo "Creating new function..."
     aws lambda create-function \
         --function-name "$FUNCTION_NAME" \
-        --runtime python3.9 \
+        --runtime python3.12 \
+        --architectures arm64 \
         --role "$ROLE_ARN" \
-        --handler handler.lambda_handler \
+        --handler "handler.$ENTRY_POINT" \
         --zip-file "fileb://$PACKAGE_FILE" \
         --timeout 30 \
-        --memory-size 512 \
+        --memory-size 1024 \
         --region "$REGION"
 fi
 
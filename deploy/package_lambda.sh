@@ -51,9 +51,14 @@ cp -r src/utils "$BUILD_DIR/"
 cp src/config.py "$BUILD_DIR/"
 
 # Install dependencies if requirements.txt exists
+# Functions run on arm64 (Graviton), so fetch aarch64 wheels regardless of the build host
 if [ -f "$PACKAGE_DIR/requirements.txt" ]; then
     echo "Installing dependencies..."
-    pip install -r "$PACKAGE_DIR/requirements.txt" -t "$BUILD_DIR" --no-deps
+    pip install -r "$PACKAGE_DIR/requirements.txt" -t "$BUILD_DIR" --no-deps \
+        --platform manylinux2014_aarch64 \
+        --implementation cp \
+        --python-version 3.12 \
+        --only-binary=:all:
 fi
 
 # Create ZIP file
@@ -1,9 +1,14 @@
 """API Gateway and Lambda functions stack."""
 
-from aws_cdk import Stack, Duration, CfnOutput
+import os
+from typing import List
+
+import jsii
+from aws_cdk import Stack, Duration, CfnOutput, RemovalPolicy
 from aws_cdk import aws_apigatewayv2 as apigw
 from aws_cdk import aws_apigatewayv2_authorizers as apigw_auth
 from aws_cdk import aws_apigatewayv2_integrations as apigw_integ
+from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_lambda as lambda_
 from aws_cdk import aws_lambda_python_alpha as lambda_python
 from aws_cdk import aws_secretsmanager as secrets
@@ -11,6 +16,22 @@ from aws_cdk import aws_iam as iam
 from constructs import Construct
 
 
+BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
+
+
+@jsii.implements(lambda_python.ICommandHooks)
+class PrecompileHooks:
+    """Bundling hooks that ship precompiled bytecode so cold starts skip the compile step."""
+    
+    def before_bundling(self, input_dir: str, output_dir: str) -> List[str]:
+        return []
+    
+    def after_bundling(self, input_dir: str, output_dir: str) -> List[str]:
+        # unchecked-hash .pyc files are used without comparing source mtimes,
+        # which asset zips do not preserve
+        return [f"python -m compileall -q --invalidation-mode unchecked-hash {output_dir}"]
+
+
 class ApiStack(Stack):
     """Stack for API Gateway and Lambda functions."""
     
@@ -33,14 +54,38 @@ class ApiStack(Stack):
             removal_policy=kwargs.get("removal_policy", None)
         )
         
+        # Short-lived cache of INRIX ETA legs shared across trips
+        self.eta_cache_table = dynamodb.Table(
+            self,
+            "EtaLegCacheTable",
+            partition_key=dynamodb.Attribute(name="legKey", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expiresAt",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        
+        # Shared dependencies, uploaded once instead of bundled into every function
+        self.common_layer = self._create_layer(
+            "CommonLayer", "layers/common", "Shared dependencies for Odessey handlers"
+        )
+        # timezonefinder's data files are too large for the shared layer, and only plan imports it
+        self.plan_layer = self._create_layer(
+            "PlanLayer", "layers/plan", "Timezone lookup dependencies for the plan handler"
+        )
+        
         # Lambda function for health check (no auth)
-        self.health_handler = self._create_handler("HealthHandler", "src.handlers.health", "handler")
+        self.health_handler = self._create_handler("HealthHandler", "src.handlers.health", "handler", memory_size=256)
+        
+        # One managed policy shared by all protected handlers instead of per-role inline copies
+        self.protected_policy = self._create_protected_policy()
         
         # Create Lambdas for each endpoint
         self.init_handler = self._create_protected_handler("InitHandler", "src.handlers.init", "handler")
         self.classify_handler = self._create_protected_handler("ClassifyHandler", "src.handlers.classify", "handler")
         self.eta_handler = self._create_protected_handler("EtaHandler", "src.handlers.eta", "handler")
-        self.plan_handler = self._create_protected_handler("PlanHandler", "src.handlers.plan", "handler")
+        self.plan_handler = self._create_protected_handler(
+            "PlanHandler", "src.handlers.plan", "handler", extra_layers=[self.plan_layer]
+        )
         self.save_handler = self._create_protected_handler("SaveHandler", "src.handlers.save", "handler")
         self.get_trip_handler = self._create_protected_handler("GetTripHandler", "src.handlers.get_trip", "handler")
         self.signup_handler = self._create_handler("SignupHandler", "src.handlers.auth", "signup_handler")
@@ -64,62 +109,26 @@ class ApiStack(Stack):
         #     user_pool_clients=[self.user_pool_client]
         # )
         
-        # Add routes
-        # Public routes
-        api.add_routes(
-            path="/health",
-            methods=[apigw.HttpMethod.GET],
-            integration=apigw_integ.HttpLambdaIntegration("HealthIntegration", self.health_handler)
-        )
-        
-        api.add_routes(
-            path="/auth/signup",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("SignupIntegration", self.signup_handler)
-        )
-        
-        api.add_routes(
-            path="/auth/login",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("LoginIntegration", self.login_handler)
-        )
-        
-        # Protected routes (temporarily without auth for bootstrap)
-        api.add_routes(
-            path="/trip/init",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("InitIntegration", self.init_handler)
-        )
-        
-        api.add_routes(
-            path="/trip/classify",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("ClassifyIntegration", self.classify_handler)
-        )
-        
-        api.add_routes(
-            path="/trip/eta",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("EtaIntegration", self.eta_handler)
-        )
-        
-        api.add_routes(
-            path="/trip/plan",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("PlanIntegration", self.plan_handler)
-        )
-        
-        api.add_routes(
-            path="/trip/save",
-            methods=[apigw.HttpMethod.POST],
-            integration=apigw_integ.HttpLambdaIntegration("SaveIntegration", self.save_handler)
-        )
-        
-        api.add_routes(
-            path="/trip/{tripId}",
-            methods=[apigw.HttpMethod.GET],
-            integration=apigw_integ.HttpLambdaIntegration("GetTripIntegration", self.get_trip_handler)
-        )
+        # Add routes (protected routes temporarily without auth for bootstrap)
+        routes = [
+            # (path, method, integration id, handler)
+            ("/health", apigw.HttpMethod.GET, "Health", self.health_handler),
+            ("/auth/signup", apigw.HttpMethod.POST, "Signup", self.signup_handler),
+            ("/auth/login", apigw.HttpMethod.POST, "Login", self.login_handler),
+            ("/trip/init", apigw.HttpMethod.POST, "Init", self.init_handler),
+            ("/trip/classify", apigw.HttpMethod.POST, "Classify", self.classify_handler),
+            ("/trip/eta", apigw.HttpMethod.POST, "Eta", self.eta_handler),
+            ("/trip/plan", apigw.HttpMethod.POST, "Plan", self.plan_handler),
+            ("/trip/save", apigw.HttpMethod.POST, "Save", self.save_handler),
+            ("/trip/{tripId}", apigw.HttpMethod.GET, "GetTrip", self.get_trip_handler),
+        ]
+        
+        for path, method, name, fn in routes:
+            api.add_routes(
+                path=path,
+                methods=[method],
+                integration=apigw_integ.HttpLambdaIntegration(f"{name}Integration", fn)
+            )
         
         # Output API URL
         CfnOutput(
@@ -129,25 +138,59 @@ class ApiStack(Stack):
             description="API Gateway URL"
         )
     
-    def _create_handler(self, id: str, module: str, handler: str) -> lambda_.Function:
-        """Create a Lambda handler with common configuration."""
+    def _create_layer(self, id: str, entry: str, description: str) -> lambda_.ILayerVersion:
+        """Create a Lambda layer from a directory holding a requirements.txt."""
+        return lambda_python.PythonLayerVersion(
+            self,
+            id,
+            entry=entry,
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12],
+            compatible_architectures=[lambda_.Architecture.ARM_64],
+            bundling=lambda_python.BundlingOptions(command_hooks=PrecompileHooks()),
+            description=description
+        )
+    
+    def _create_handler(self, id: str, module: str, handler: str, memory_size: int = 1024,
+                        extra_layers: List[lambda_.ILayerVersion] = None) -> lambda_.IFunction:
+        """
+        Create a Lambda handler with common configuration.
+        
+        CPU scales with memory, so the default leaves headroom for boto3 init and
+        JSON work. SnapStart only applies to published versions, so the returned
+        function is a `live` alias on the current version. Dependencies only one
+        handler needs come from extra_layers rather than the common layer.
+        """
         fn = lambda_python.PythonFunction(
             self,
             id,
-            runtime=lambda_.Runtime.PYTHON_3_9,
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            architecture=lambda_.Architecture.ARM_64,
             entry="src",
             index=f"handlers/{module.split('.')[-1]}.py",
             handler=handler,
             timeout=Duration.seconds(30),
+            memory_size=memory_size,
+            layers=[self.common_layer, *(extra_layers or [])],
+            # boto3/botocore ship with the Lambda runtime; bundling another copy only grows the package.
+            # Stale bytecode and tests are never needed at runtime either.
+            bundling=lambda_python.BundlingOptions(
+                asset_excludes=[
+                    "boto3*", "botocore*", "s3transfer*", "jmespath*",
+                    "**/tests/**", "**/*.pyc", "**/__pycache__/**"
+                ],
+                command_hooks=PrecompileHooks()
+            ),
+            snap_start=lambda_.SnapStartConf.ON_PUBLISHED_VERSIONS,
             environment={
                 "USERS_TABLE_NAME": self.users_table.table_name,
                 "TRIPS_TABLE_NAME": self.trips_table.table_name,
                 "TRIP_STATES_TABLE_NAME": self.trip_states_table.table_name,
+                "ETA_CACHE_TABLE_NAME": self.eta_cache_table.table_name,
                 "COGNITO_USER_POOL_ID": self.user_pool.user_pool_id,
                 "COGNITO_CLIENT_ID": self.user_pool_client.user_pool_client_id,
                 "INRIX_SECRET_ARN": self.inrix_secret.secret_arn,
                 "LOCATION_PLACE_INDEX_NAME": "odessey-place-index",  # Update with actual name
-                "BEDROCK_MODEL_ID": "anthropic.claude-3-sonnet-20240229-v1:0"
+                "BEDROCK_MODEL_ID": BEDROCK_MODEL_ID
             }
         )
         
@@ -155,37 +198,41 @@ class ApiStack(Stack):
         self.users_table.grant_read_write_data(fn)
         self.trips_table.grant_read_write_data(fn)
         self.trip_states_table.grant_read_write_data(fn)
+        self.eta_cache_table.grant_read_write_data(fn)
         self.inrix_secret.grant_read(fn)
         
-        return fn
+        return lambda_.Alias(self, f"{id}Live", alias_name="live", version=fn.current_version)
     
-    def _create_protected_handler(self, id: str, module: str, handler: str) -> lambda_.Function:
-        """Create a Lambda handler with all permissions (DynamoDB, Location, Bedrock)."""
-        fn = self._create_handler(id, module, handler)
-        
-        # Grant Cognito permissions
-        fn.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=["cognito-idp:GetUser"],
-                resources=[self.user_pool.user_pool_arn]
-            )
-        )
-        
-        # Grant Amazon Location permissions
-        fn.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=["geo:SearchPlaceIndexForText"],
-                resources=["*"]  # Will be restricted to specific index
-            )
-        )
-        
-        # Grant Bedrock permissions
-        fn.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=["bedrock:InvokeModel"],
-                resources=[f"arn:aws:bedrock:*:*:foundation-model/*"]
-            )
+    def _create_protected_policy(self) -> iam.ManagedPolicy:
+        """Create the managed policy for protected handlers (Cognito, Location, Bedrock)."""
+        return iam.ManagedPolicy(
+            self,
+            "ProtectedHandlerPolicy",
+            statements=[
+                # Grant Cognito permissions
+                iam.PolicyStatement(
+                    actions=["cognito-idp:GetUser"],
+                    resources=[self.user_pool.user_pool_arn]
+                ),
+                # Grant Amazon Location permissions
+                iam.PolicyStatement(
+                    actions=["geo:SearchPlaceIndexForText"],
+                    resources=["*"]  # Will be restricted to specific index
+                ),
+                # Grant Bedrock permissions for the configured model only;
+                # plan_itinerary reads its response as a stream
+                iam.PolicyStatement(
+                    actions=["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
+                    resources=[f"arn:aws:bedrock:{self.region}::foundation-model/{BEDROCK_MODEL_ID}"]
+                )
+            ]
         )
+    
+    def _create_protected_handler(self, id: str, module: str, handler: str,
+                                  extra_layers: List[lambda_.ILayerVersion] = None) -> lambda_.IFunction:
+        """Create a Lambda handler with all permissions (DynamoDB, Location, Bedrock)."""
+        fn = self._create_handler(id, module, handler, extra_layers=extra_layers)
+        fn.role.add_managed_policy(self.protected_policy)
         
         return fn
 
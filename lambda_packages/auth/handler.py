@@ -1,61 +1,147 @@
 """Authentication handlers."""
 
-import json
-import boto3
+import orjson
 import os
 import time
 import hmac
 import hashlib
 import base64
+import functools
+import logging
+import re
+from pydantic import BaseModel, Field, ValidationError
 
 
-def lambda_handler(event, context):
-    """
-    Route requests to appropriate auth handler based on path.
-    """
-    try:
-        # Extract path from event - API Gateway includes stage in path like /prod/auth/signup
-        full_path = event.get("path", "")
-        # Remove stage prefix if present (e.g., "/prod/auth/signup" -> "/auth/signup")
-        path = full_path.replace("/prod", "").replace("/$default", "")
-        print(f"Received request for path: {full_path} (normalized: {path})")
-        
-        if path == "/auth/signup":
-            return signup_handler(event, context)
-        elif path == "/auth/login":
-            return login_handler(event, context)
-        else:
-            return create_response(404, {"error": "Not found", "code": "NOT_FOUND"})
-    except Exception as e:
-        print(f"Lambda handler error: {str(e)}")
-        return create_response(500, {"error": "Internal server error", "code": "INTERNAL_ERROR"})
+AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
+USERS_TABLE_NAME = os.getenv("USERS_TABLE_NAME", "Users")
+USERS_EMAIL_INDEX_NAME = os.getenv("USERS_EMAIL_INDEX_NAME", "email-index")
+COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID")
+COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
+COGNITO_CLIENT_SECRET = os.getenv("COGNITO_CLIENT_SECRET")
+_HMAC_KEY = COGNITO_CLIENT_SECRET.encode('utf-8') if COGNITO_CLIENT_SECRET else None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO"))
+
+
+@functools.lru_cache(maxsize=1)
+def _boto_cfg():
+    """Keep TLS connections alive so warm invocations skip the handshake."""
+    from botocore.config import Config
+    return Config(
+        tcp_keepalive=True,
+        connect_timeout=1,
+        read_timeout=3,
+        retries={"mode": "adaptive", "max_attempts": 3},
+        max_pool_connections=10
+    )
+
+
+# boto3 is imported on first use so paths that never reach AWS skip its import cost;
+# the clients are then cached for the lifetime of the sandbox
+@functools.lru_cache(maxsize=1)
+def _cognito():
+    """Get the shared Cognito client."""
+    import boto3
+    return boto3.client("cognito-idp", region_name=AWS_REGION, config=_boto_cfg())
+
+
+@functools.lru_cache(maxsize=1)
+def _users_table():
+    """Get the shared Users table resource."""
+    import boto3
+    return boto3.resource("dynamodb", region_name=AWS_REGION, config=_boto_cfg()).Table(USERS_TABLE_NAME)
+
+
+# Cognito password-policy failures, checked in priority order
+_PASSWORD_RULES = [
+    (re.compile(r"symbol", re.I), "Password must contain at least one symbol character"),
+    (re.compile(r"uppercase", re.I), "Password must contain at least one uppercase letter"),
+    (re.compile(r"lowercase", re.I), "Password must contain at least one lowercase letter"),
+    (re.compile(r"number|digit", re.I), "Password must contain at least one number"),
+    (re.compile(r"length", re.I), "Password does not meet minimum length requirement (8 characters)"),
+]
+_PASSWORD_DEFAULT = "Password does not meet requirements: must contain uppercase, lowercase, numbers, and symbols"
+
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "GET,POST,OPTIONS"
+}
+
+
+class SignupRequest(BaseModel):
+    """User signup request."""
+    email: str = Field(..., min_length=1, pattern="@")
+    password: str = Field(..., min_length=8)
+
+
+class LoginRequest(BaseModel):
+    """User login request."""
+    email: str = Field(..., min_length=1)
+    password: str = Field(..., min_length=1)
+
+
+def validation_error_response(exc):
+    """Map the first pydantic error onto the existing 400 responses."""
+    err = exc.errors(include_url=False)[0]
+    field = err["loc"][0] if err["loc"] else None
+    
+    if err["type"] == "json_invalid":
+        return create_response(400, {"error": "Invalid JSON in request body", "code": "INVALID_JSON"})
+    if field == "email":
+        if err["type"] == "missing" or not err.get("input"):
+            return create_response(400, {"error": "Email is required", "code": "MISSING_EMAIL"})
+        return create_response(400, {"error": "Invalid email format", "code": "INVALID_EMAIL"})
+    if field == "password":
+        if err["type"] == "missing" or not err.get("input"):
+            return create_response(400, {"error": "Password is required", "code": "MISSING_PASSWORD"})
+        return create_response(400, {"error": "Password must be at least 8 characters", "code": "WEAK_PASSWORD"})
+    return create_response(400, {"error": "Request body must be a JSON object", "code": "INVALID_JSON"})
 
 
 def create_response(status_code, body):
     """Create API Gateway response."""
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Methods": "GET,POST,OPTIONS"
-        },
-        "body": json.dumps(body)
+        "headers": _HEADERS,
+        "body": orjson.dumps(body).decode()
     }
 
 
-def compute_secret_hash(username, client_id, client_secret):
-    """Compute SECRET_HASH for Cognito operations."""
-    message = username + client_id
+@functools.lru_cache(maxsize=1024)
+def compute_secret_hash(username):
+    """Compute SECRET_HASH for Cognito operations, cached per username."""
+    message = username + COGNITO_CLIENT_ID
     dig = hmac.new(
-        client_secret.encode('utf-8'),
+        _HMAC_KEY,
         message.encode('utf-8'),
         hashlib.sha256
     ).digest()
     return base64.b64encode(dig).decode()
 
 
+def email_hash(email):
+    """Short, non-reversible email fingerprint so logs never carry the address."""
+    return hashlib.sha256(email.encode('utf-8')).hexdigest()[:8]
+
+
+def get_token_sub(id_token):
+    """
+    Read the `sub` claim from a Cognito IdToken.
+    
+    The token comes straight from InitiateAuth over TLS, so the payload is
+    decoded locally without signature verification.
+    """
+    try:
+        payload = id_token.split('.')[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return claims.get('sub')
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
 def signup_handler(event, context):
     """
     Handle user signup.
@@ -64,59 +150,33 @@ def signup_handler(event, context):
     Body: {email, password}
     """
     try:
-        print("Starting signup process")
-        
         # Parse body
         body_str = event.get("body", "{}")
-        print(f"Request body: {body_str}")
         
         if not body_str:
             return create_response(400, {"error": "Request body is required", "code": "MISSING_BODY"})
         
-        body = json.loads(body_str)
-        print(f"Parsed body: {body}")
-        
-        # Validate required fields
-        email = body.get("email")
-        password = body.get("password")
-        
-        if not email:
-            return create_response(400, {"error": "Email is required", "code": "MISSING_EMAIL"})
-        
-        if not password:
-            return create_response(400, {"error": "Password is required", "code": "MISSING_PASSWORD"})
-        
-        # Basic email validation
-        if "@" not in email:
-            return create_response(400, {"error": "Invalid email format", "code": "INVALID_EMAIL"})
-        
-        # Basic password validation
-        if len(password) < 8:
-            return create_response(400, {"error": "Password must be at least 8 characters", "code": "WEAK_PASSWORD"})
-        
-        print(f"Attempting to create user: {email}")
-        
-        # Initialize Cognito client
-        cognito_client = boto3.client("cognito-idp", region_name=os.getenv("AWS_REGION", "us-east-2"))
-        user_pool_id = os.getenv("COGNITO_USER_POOL_ID")
-        client_id = os.getenv("COGNITO_CLIENT_ID")
-        client_secret = os.getenv("COGNITO_CLIENT_SECRET")
+        # Parse and validate in a single pass
+        try:
+            signup_req = SignupRequest.model_validate_json(body_str)
+        except ValidationError as e:
+            return validation_error_response(e)
         
-        print(f"User Pool ID: {user_pool_id}")
-        print(f"Client ID: {client_id}")
+        email = signup_req.email
+        password = signup_req.password
         
-        if not user_pool_id or not client_id:
+        if not COGNITO_USER_POOL_ID or not COGNITO_CLIENT_ID:
             return create_response(500, {"error": "Cognito configuration missing", "code": "CONFIG_ERROR"})
         
         # Compute SECRET_HASH if client secret is provided
         secret_hash = None
-        if client_secret:
-            secret_hash = compute_secret_hash(email, client_id, client_secret)
+        if COGNITO_CLIENT_SECRET:
+            secret_hash = compute_secret_hash(email)
         
         # Create user in Cognito
         try:
             signup_params = {
-                "ClientId": client_id,
+                "ClientId": COGNITO_CLIENT_ID,
                 "Username": email,
                 "Password": password,
                 "UserAttributes": [
@@ -130,8 +190,7 @@ def signup_handler(event, context):
             if secret_hash:
                 signup_params["SecretHash"] = secret_hash
             
-            response = cognito_client.sign_up(**signup_params)
-            print(f"Cognito signup response: {response}")
+            response = _cognito().sign_up(**signup_params)
             
             user_id = response.get('UserSub')
             if not user_id:
@@ -139,63 +198,49 @@ def signup_handler(event, context):
             
             # Admin confirm the user immediately so they can log in
             try:
-                cognito_client.admin_confirm_sign_up(
-                    UserPoolId=user_pool_id,
+                _cognito().admin_confirm_sign_up(
+                    UserPoolId=COGNITO_USER_POOL_ID,
                     Username=email
                 )
-                print(f"User {email} admin-confirmed successfully")
+                logger.debug("User admin-confirmed: email_hash=%s", email_hash(email))
             except Exception as e:
-                print(f"Warning: Failed to admin-confirm user {email}: {str(e)}")
+                logger.warning("Failed to admin-confirm user: email_hash=%s: %s", email_hash(email), e)
                 # Don't fail signup if confirmation fails, user is still created
             
-        except cognito_client.exceptions.UsernameExistsException:
+        except _cognito().exceptions.UsernameExistsException:
             return create_response(409, {"error": "User already exists", "code": "USER_EXISTS"})
-        except cognito_client.exceptions.InvalidPasswordException as e:
+        except _cognito().exceptions.InvalidPasswordException as e:
             error_msg = str(e)
-            print(f"Cognito signup error: {error_msg}")
+            logger.warning("Cognito signup error: %s", error_msg)
             # Extract the specific password requirement
             if "Password did not conform with policy" in error_msg:
-                # Try to extract the specific requirement
-                if "symbol" in error_msg.lower():
-                    return create_response(400, {"error": "Password must contain at least one symbol character", "code": "INVALID_PASSWORD"})
-                elif "uppercase" in error_msg.lower():
-                    return create_response(400, {"error": "Password must contain at least one uppercase letter", "code": "INVALID_PASSWORD"})
-                elif "lowercase" in error_msg.lower():
-                    return create_response(400, {"error": "Password must contain at least one lowercase letter", "code": "INVALID_PASSWORD"})
-                elif "number" in error_msg.lower() or "digit" in error_msg.lower():
-                    return create_response(400, {"error": "Password must contain at least one number", "code": "INVALID_PASSWORD"})
-                elif "length" in error_msg.lower():
-                    return create_response(400, {"error": "Password does not meet minimum length requirement (8 characters)", "code": "INVALID_PASSWORD"})
-                else:
-                    return create_response(400, {"error": "Password does not meet requirements: must contain uppercase, lowercase, numbers, and symbols", "code": "INVALID_PASSWORD"})
+                message = next((msg for pattern, msg in _PASSWORD_RULES if pattern.search(error_msg)), _PASSWORD_DEFAULT)
+                return create_response(400, {"error": message, "code": "INVALID_PASSWORD"})
             return create_response(400, {"error": error_msg, "code": "INVALID_PASSWORD"})
-        except cognito_client.exceptions.InvalidParameterException as e:
+        except _cognito().exceptions.InvalidParameterException as e:
             error_msg = str(e)
-            print(f"Cognito signup error: {error_msg}")
+            logger.warning("Cognito signup error: %s", error_msg)
             return create_response(400, {"error": error_msg, "code": "INVALID_PARAMETER"})
         except Exception as e:
-            print(f"Cognito signup error: {str(e)}")
+            logger.error("Cognito signup error: %s", e)
             return create_response(500, {"error": f"Signup failed: {str(e)}", "code": "COGNITO_ERROR"})
         
         # Store in DynamoDB
         try:
-            dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-            users_table = dynamodb.Table(os.getenv("USERS_TABLE_NAME", "Users"))
-            
             user_item = {
                 "userId": user_id,
                 "email": email,
                 "createdAt": str(int(time.time()))
             }
             
-            users_table.put_item(Item=user_item)
-            print(f"User stored in DynamoDB: {user_id}")
+            _users_table().put_item(Item=user_item)
+            logger.debug("User stored in DynamoDB: %s", user_id)
             
         except Exception as e:
-            print(f"DynamoDB error: {str(e)}")
+            logger.error("DynamoDB error: %s", e)
             # Don't fail signup if DynamoDB fails, user is already created in Cognito
         
-        print(f"User signed up successfully: {email}")
+        logger.info("signup: email_hash=%s", email_hash(email))
         
         return create_response(200, {
             "userId": user_id,
@@ -203,11 +248,8 @@ def signup_handler(event, context):
             "message": "User signed up successfully"
         })
     
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {str(e)}")
-        return create_response(400, {"error": "Invalid JSON in request body", "code": "INVALID_JSON"})
     except Exception as e:
-        print(f"Signup error: {str(e)}")
+        logger.error("Signup error: %s", e)
         return create_response(500, {"error": f"Failed to sign up user: {str(e)}", "code": "INTERNAL_ERROR"})
 
 
@@ -219,49 +261,33 @@ def login_handler(event, context):
     Body: {email, password}
     """
     try:
-        print("Starting login process")
-        
         # Parse body
         body_str = event.get("body", "{}")
-        print(f"Request body: {body_str}")
         
         if not body_str:
             return create_response(400, {"error": "Request body is required", "code": "MISSING_BODY"})
         
-        body = json.loads(body_str)
-        print(f"Parsed body: {body}")
-        
-        # Validate required fields
-        email = body.get("email")
-        password = body.get("password")
-        
-        if not email:
-            return create_response(400, {"error": "Email is required", "code": "MISSING_EMAIL"})
-        
-        if not password:
-            return create_response(400, {"error": "Password is required", "code": "MISSING_PASSWORD"})
-        
-        print(f"Attempting to login user: {email}")
-        
-        # Initialize Cognito client
-        cognito_client = boto3.client("cognito-idp", region_name=os.getenv("AWS_REGION", "us-east-2"))
-        client_id = os.getenv("COGNITO_CLIENT_ID")
-        client_secret = os.getenv("COGNITO_CLIENT_SECRET")
+        # Parse and validate in a single pass
+        try:
+            login_req = LoginRequest.model_validate_json(body_str)
+        except ValidationError as e:
+            return validation_error_response(e)
         
-        print(f"Client ID: {client_id}")
+        email = login_req.email
+        password = login_req.password
         
-        if not client_id:
+        if not COGNITO_CLIENT_ID:
             return create_response(500, {"error": "Cognito configuration missing", "code": "CONFIG_ERROR"})
         
         # Compute SECRET_HASH if client secret is provided
         secret_hash = None
-        if client_secret:
-            secret_hash = compute_secret_hash(email, client_id, client_secret)
+        if COGNITO_CLIENT_SECRET:
+            secret_hash = compute_secret_hash(email)
         
         # Authenticate with Cognito
         try:
             auth_params = {
-                "ClientId": client_id,
+                "ClientId": COGNITO_CLIENT_ID,
                 "AuthFlow": 'USER_PASSWORD_AUTH',
                 "AuthParameters": {
                     'USERNAME': email,
@@ -272,46 +298,47 @@ def login_handler(event, context):
             if secret_hash:
                 auth_params["AuthParameters"]["SECRET_HASH"] = secret_hash
             
-            response = cognito_client.initiate_auth(**auth_params)
-            print(f"Cognito login response: {response}")
+            response = _cognito().initiate_auth(**auth_params)
             
             auth_result = response.get('AuthenticationResult', {})
             access_token = auth_result.get('AccessToken')
             refresh_token = auth_result.get('RefreshToken')
+            user_id = get_token_sub(auth_result.get('IdToken'))
             
             if not access_token:
                 return create_response(401, {"error": "Authentication failed", "code": "AUTH_FAILED"})
             
-        except cognito_client.exceptions.NotAuthorizedException:
+        except _cognito().exceptions.NotAuthorizedException:
             return create_response(401, {"error": "Invalid email or password", "code": "INVALID_CREDENTIALS"})
-        except cognito_client.exceptions.UserNotFoundException:
+        except _cognito().exceptions.UserNotFoundException:
             return create_response(401, {"error": "User not found", "code": "USER_NOT_FOUND"})
         except Exception as e:
-            print(f"Cognito login error: {str(e)}")
+            logger.error("Cognito login error: %s", e)
             return create_response(500, {"error": f"Cognito login failed: {str(e)}", "code": "COGNITO_ERROR"})
         
-        # Get user ID from DynamoDB
-        try:
-            dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-            users_table = dynamodb.Table(os.getenv("USERS_TABLE_NAME", "Users"))
-            
-            response = users_table.scan(
-                FilterExpression="email = :email",
-                ExpressionAttributeValues={":email": email}
-            )
-            
-            items = response.get("Items", [])
-            if not items:
-                return create_response(404, {"error": "User not found in database", "code": "USER_NOT_FOUND"})
-            
-            user_id = items[0]["userId"]
-            print(f"User found in DynamoDB: {user_id}")
-            
-        except Exception as e:
-            print(f"DynamoDB error: {str(e)}")
-            return create_response(500, {"error": f"Database error: {str(e)}", "code": "DATABASE_ERROR"})
+        # userId is the Cognito sub; only fall back to DynamoDB if the IdToken lacked it
+        if not user_id:
+            try:
+                from boto3.dynamodb.conditions import Key
+                response = _users_table().query(
+                    IndexName=USERS_EMAIL_INDEX_NAME,
+                    KeyConditionExpression=Key("email").eq(email),
+                    ProjectionExpression="userId",
+                    Limit=1
+                )
+                
+                items = response.get("Items", [])
+                if not items:
+                    return create_response(404, {"error": "User not found in database", "code": "USER_NOT_FOUND"})
+                
+                user_id = items[0]["userId"]
+                logger.debug("User found in DynamoDB: %s", user_id)
+                
+            except Exception as e:
+                logger.error("DynamoDB error: %s", e)
+                return create_response(500, {"error": f"Database error: {str(e)}", "code": "DATABASE_ERROR"})
         
-        print(f"User logged in successfully: {email}")
+        logger.info("login: email_hash=%s", email_hash(email))
         
         return create_response(200, {
             "accessToken": access_token,
@@ -321,9 +348,6 @@ def login_handler(event, context):
             "message": "Logged in successfully"
         })
     
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {str(e)}")
-        return create_response(400, {"error": "Invalid JSON in request body", "code": "INVALID_JSON"})
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         return create_response(500, {"error": f"Failed to log in user: {str(e)}", "code": "INTERNAL_ERROR"})
\ No newline at end of file
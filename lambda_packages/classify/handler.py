@@ -1,18 +1,19 @@
 """Classify POIs handler."""
 
-import json
-import os
-import boto3
-from src.models.dto import TripIdOnly, ClassifiedStop, ClassifyResponse
+from pydantic import ValidationError as PydanticValidationError
+from src.config import TRIP_STATES_TABLE_NAME
+from src.models.dto import TripIdOnly, ClassifiedStop, ClassifyResponse, TRIP_ID_ADAPTER
 from src.models.dynamo import TripState
 from src.services.bedrock import get_bedrock_service
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator, validate_trip_ownership
+from src.utils.aws import get_table, prewarm
 from src.utils.errors import ValidationError, NotFoundError
-from src.utils.logger import info, error
+from src.utils.logger import info, error, warning
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-trip_states_table = dynamodb.Table(os.getenv("TRIP_STATES_TABLE_NAME", "TripStates"))
+# Building the service creates the bedrock-runtime client (and imports boto3)
+# during init; no API call is made, so nothing is sent that the role can't do
+prewarm(get_bedrock_service)
 
 
 def lambda_handler(event, context):
@@ -40,8 +41,7 @@ def handler(event, context):
         ClassifyResponse with classified stops
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        trip_req = TripIdOnly(**body)
+        trip_req = TRIP_ID_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Extract user ID
         auth_service = get_auth_service()
@@ -51,7 +51,11 @@ def handler(event, context):
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
         # Load trip state
-        response = trip_states_table.get_item(Key={"tripId": trip_req.tripId})
+        trip_states_table = get_table(TRIP_STATES_TABLE_NAME)
+        response = trip_states_table.get_item(
+            Key={"tripId": trip_req.tripId},
+            **TripState.projection("tripId", "userId", "geocodedStops")
+        )
         
         if "Item" not in response:
             return lambda_response(404, {"error": "Trip not found", "code": "NOT_FOUND"})
@@ -61,44 +65,47 @@ def handler(event, context):
         # Validate ownership
         validate_trip_ownership(trip_state.userId, user_id)
         
-        # Classify each stop using Bedrock
+        # Classify all stops with one batched Bedrock call
         bedrock_service = get_bedrock_service()
+        classifications = bedrock_service.classify_pois_batch(trip_state.geocodedStops)
         classified_stops = []
         
-        for geocoded in trip_state.geocodedStops:
+        for geocoded, classification in zip(trip_state.geocodedStops, classifications):
+            if classification is None:
+                # Skip stops that could not be classified
+                continue
+            
+            # Validate before anything is written: the batch call only checks that
+            # the fields exist, and a null reason or fractional stayMin would
+            # otherwise fail the response after the stops were already saved
             try:
-                classification = bedrock_service.classify_poi(
+                classified_stop = ClassifiedStop(
                     name=geocoded["name"],
                     lat=geocoded["lat"],
-                    lon=geocoded["lon"]
+                    lon=geocoded["lon"],
+                    category=classification.get("category"),
+                    bestTimeWindow=classification.get("bestTimeWindow"),
+                    reason=classification.get("reason"),
+                    stayMin=classification.get("stayMin", 45)
                 )
-                
-                classified_stop = {
-                    "name": geocoded["name"],
-                    "lat": geocoded["lat"],
-                    "lon": geocoded["lon"],
-                    "category": classification["category"],
-                    "bestTimeWindow": classification["bestTimeWindow"],
-                    "reason": classification["reason"],
-                    "stayMin": classification.get("stayMin", 45)
-                }
-                classified_stops.append(classified_stop)
-            
-            except Exception as e:
-                error(f"Failed to classify '{geocoded['name']}': {str(e)}")
-                # Skip this stop
+            except PydanticValidationError as e:
+                warning(f"Skipping stop {geocoded['name']}: invalid classification ({e.error_count()} errors)")
                 continue
+            classified_stops.append(classified_stop)
         
         # Update trip state
-        trip_state.classifiedStops = classified_stops
-        trip_states_table.put_item(Item=trip_state.to_item())
+        trip_state.update_attrs(
+            trip_states_table,
+            owner_id=user_id,
+            classifiedStops=[stop.model_dump() for stop in classified_stops]
+        )
         
         info(f"Classified {len(classified_stops)} stops for trip: {trip_req.tripId}")
         
-        return lambda_response(200, {
-            "tripId": trip_req.tripId,
-            "classifiedStops": classified_stops
-        })
+        return lambda_response(200, ClassifyResponse(
+            tripId=trip_req.tripId,
+            classifiedStops=classified_stops
+        ).model_dump_json())
     
     except ValidationError as e:
         return lambda_response(400, {"error": e.message, "code": e.code})
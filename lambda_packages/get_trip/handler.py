@@ -1,17 +1,13 @@
 """Get saved trip handler."""
 
-import os
-import boto3
-from src.models.dynamo import Trip
+from src.config import TRIPS_TABLE_NAME
+from src.models.dynamo import Trip, projection
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator, validate_trip_ownership
+from src.utils.aws import get_table
 from src.utils.errors import NotFoundError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-trips_table = dynamodb.Table(os.getenv("TRIPS_TABLE_NAME", "Trips"))
-
-
 def lambda_handler(event, context):
     """
     Get a saved itinerary.
@@ -48,26 +44,24 @@ def handler(event, context):
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
         # Fetch from Trips table
-        response = trips_table.get_item(Key={"tripId": trip_id})
+        trips_table = get_table(TRIPS_TABLE_NAME)
+        # Only the attributes returned below (plus the owner) are read
+        response = trips_table.get_item(
+            Key={"tripId": trip_id},
+            **projection("userId", *Trip.PROJECTED_ATTRIBUTES)
+        )
         
         if "Item" not in response:
             return lambda_response(404, {"error": "Trip not found", "code": "NOT_FOUND"})
         
-        trip = Trip.from_item(response["Item"])
+        item = response["Item"]
         
         # Validate ownership
-        validate_trip_ownership(trip.userId, user_id)
+        validate_trip_ownership(item["userId"], user_id)
         
         info(f"Retrieved trip: {trip_id}")
         
-        return lambda_response(200, {
-            "tripId": trip.tripId,
-            "order": trip.order,
-            "itinerary": trip.itinerary,
-            "totalTravelMinutes": trip.totalTravelMinutes,
-            "confidence": trip.confidence,
-            "finishBy": trip.finishBy
-        })
+        return lambda_response(200, Trip.project_item(item))
     
     except NotFoundError as e:
         return lambda_response(404, {"error": e.message, "code": e.code})
@@ -3,6 +3,17 @@
 import json
 
 
+_HEADERS = {
+    "Content-Type": "application/json"
+}
+
+# The payload never changes, so serialize it once per sandbox
+_BODY = json.dumps({
+    "status": "healthy",
+    "service": "odessey-backend"
+}, separators=(",", ":"))
+
+
 def lambda_handler(event, context):
     """
     Health check endpoint.
@@ -12,11 +23,6 @@ def lambda_handler(event, context):
     """
     return {
         "statusCode": 200,
-        "headers": {
-            "Content-Type": "application/json"
-        },
-        "body": json.dumps({
-            "status": "healthy",
-            "service": "odessey-backend"
-        })
-    }
+        "headers": _HEADERS,
+        "body": _BODY
+    }
\ No newline at end of file
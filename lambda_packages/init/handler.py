@@ -1,21 +1,16 @@
 """Initialize trip draft handler."""
 
-import json
-import os
-import boto3
-from src.models.dto import InitRequest, InitResponse, TripIdOnly
+from src.config import TRIP_STATES_TABLE_NAME
+from src.models.dto import InitRequest, InitResponse, TripIdOnly, INIT_REQ_ADAPTER
 from src.models.dynamo import TripState
 from src.services.geocode import get_geocode_service
 from src.services.time_utils import calculate_trip_duration_minutes
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator
-from src.utils.errors import ValidationError
+from src.utils.aws import get_table
+from src.utils.errors import GeocodeError, ValidationError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-trip_states_table = dynamodb.Table(os.getenv("TRIP_STATES_TABLE_NAME", "TripStates"))
-
-
 def lambda_handler(event, context):
     """
     Initialize a new trip draft.
@@ -41,10 +36,8 @@ def handler(event, context):
         InitResponse with tripId and duration
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        
         # Validate request
-        init_req = InitRequest(**body)
+        init_req = INIT_REQ_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Extract user ID from event
         auth_service = get_auth_service()
@@ -53,33 +46,32 @@ def handler(event, context):
         if not user_id:
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
-        # Geocode start location
+        # Geocode the start location and all stops in parallel
         geocode_service = get_geocode_service()
-        start_coords = geocode_service.geocode_address(init_req.startLocation)
+        start_coords, *stop_coords = geocode_service.geocode_batch([init_req.startLocation, *init_req.stops])
         
-        # Geocode all stops in parallel
-        geocoded_stops = []
-        for stop_name in init_req.stops:
-            try:
-                coords = geocode_service.geocode_address(stop_name)
-                geocoded_stops.append({
-                    "name": stop_name,
-                    "lat": coords["lat"],
-                    "lon": coords["lon"]
-                })
-            except Exception as e:
-                error(f"Failed to geocode stop '{stop_name}': {str(e)}")
-                return lambda_response(400, {
-                    "error": f"Could not geocode stop: {stop_name}",
-                    "code": "GEOCODE_ERROR",
-                    "badStopNames": [stop_name]
-                })
+        if start_coords is None:
+            raise GeocodeError(f"Could not geocode start location: {init_req.startLocation}")
+        
+        bad_stop_names = [name for name, coords in zip(init_req.stops, stop_coords) if coords is None]
+        if bad_stop_names:
+            error(f"Failed to geocode stops: {bad_stop_names}")
+            return lambda_response(400, {
+                "error": f"Could not geocode stop: {', '.join(bad_stop_names)}",
+                "code": "GEOCODE_ERROR",
+                "badStopNames": bad_stop_names
+            })
+        
+        geocoded_stops = [
+            {"name": stop_name, "lat": coords["lat"], "lon": coords["lon"]}
+            for stop_name, coords in zip(init_req.stops, stop_coords)
+        ]
         
         # Calculate trip duration
         duration_minutes = calculate_trip_duration_minutes(init_req.startTime, init_req.endTime)
         
-        # Generate trip ID
-        trip_id = TripState.generate_id()
+        # Generate trip ID; its ULID also supplies the creation timestamp
+        trip_id, created_at = TripState.generate_id_with_ts()
         
         # Create trip state
         trip_state = TripState(
@@ -90,19 +82,21 @@ def handler(event, context):
             endTime=init_req.endTime,
             mode=init_req.mode,
             rawStops=init_req.stops,
-            geocodedStops=geocoded_stops
+            geocodedStops=geocoded_stops,
+            lastUpdatedAt=created_at
         )
         
         # Store in DynamoDB
+        trip_states_table = get_table(TRIP_STATES_TABLE_NAME)
         trip_states_table.put_item(Item=trip_state.to_item())
         
         info(f"Initialized trip: {trip_id}")
         
-        return lambda_response(200, {
-            "tripId": trip_id,
-            "tripDurationMinutes": duration_minutes,
-            "message": "Trip initialized successfully"
-        })
+        return lambda_response(200, InitResponse(
+            tripId=trip_id,
+            tripDurationMinutes=duration_minutes,
+            message="Trip initialized successfully"
+        ).model_dump_json())
     
     except ValidationError as e:
         return lambda_response(400, {"error": e.message, "code": e.code})
@@ -1,20 +1,20 @@
 """Plan itinerary handler."""
 
-import json
-import os
-import boto3
-from src.models.dto import TripIdOnly, ItineraryItem, PlanResponse
+from src.config import TRIP_STATES_TABLE_NAME
+from src.models.dto import TripIdOnly, ItineraryItem, PlanResponse, TRIP_ID_ADAPTER
 from src.models.dynamo import TripState
 from src.services.bedrock import get_bedrock_service
 from src.services.time_utils import get_timezone_from_coords
 from src.services.validate import validate_itinerary, recompute_finish_by
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator, validate_trip_ownership
+from src.utils.aws import get_table, prewarm
 from src.utils.errors import ValidationError, NotFoundError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-trip_states_table = dynamodb.Table(os.getenv("TRIP_STATES_TABLE_NAME", "TripStates"))
+# Building the service creates the bedrock-runtime client (and imports boto3)
+# during init; no API call is made, so nothing is sent that the role can't do
+prewarm(get_bedrock_service)
 
 
 def lambda_handler(event, context):
@@ -42,8 +42,7 @@ def handler(event, context):
         PlanResponse with final itinerary
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        trip_req = TripIdOnly(**body)
+        trip_req = TRIP_ID_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Extract user ID
         auth_service = get_auth_service()
@@ -53,6 +52,7 @@ def handler(event, context):
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
         # Load trip state
+        trip_states_table = get_table(TRIP_STATES_TABLE_NAME)
         response = trip_states_table.get_item(Key={"tripId": trip_req.tripId})
         
         if "Item" not in response:
@@ -109,8 +109,7 @@ def handler(event, context):
             planned["finishBy"] = recompute_finish_by(planned["itinerary"])
         
         # Store final itinerary in trip state
-        trip_state.finalItinerary = planned
-        trip_states_table.put_item(Item=trip_state.to_item())
+        trip_state.update_attrs(trip_states_table, owner_id=user_id, finalItinerary=planned)
         
         info(f"Generated itinerary for trip: {trip_req.tripId}")
         
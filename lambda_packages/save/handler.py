@@ -1,20 +1,16 @@
 """Save trip handler."""
 
-import json
-import os
-import boto3
-from src.models.dto import SaveRequest, SaveResponse
-from src.models.dynamo import TripState, Trip
+from datetime import datetime
+from botocore.exceptions import ClientError
+from src.config import TRIP_STATES_TABLE_NAME, TRIPS_TABLE_NAME
+from src.models.dto import SaveRequest, SaveResponse, SAVE_REQ_ADAPTER
+from src.models.dynamo import TripState, Trip, projection
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator, validate_trip_ownership
+from src.utils.aws import get_ddb_resource, serialize_item
 from src.utils.errors import ValidationError, NotFoundError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-east-2"))
-trip_states_table = dynamodb.Table(os.getenv("TRIP_STATES_TABLE_NAME", "TripStates"))
-trips_table = dynamodb.Table(os.getenv("TRIPS_TABLE_NAME", "Trips"))
-
-
 def lambda_handler(event, context):
     """
     Save finalized itinerary.
@@ -40,8 +36,7 @@ def handler(event, context):
         SaveResponse with confirmation
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        save_req = SaveRequest(**body)
+        save_req = SAVE_REQ_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Extract user ID
         auth_service = get_auth_service()
@@ -50,13 +45,34 @@ def handler(event, context):
         if not user_id:
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
-        # Load trip state
-        response = trip_states_table.get_item(Key={"tripId": save_req.tripId})
+        # Load the trip state and any earlier save of this trip in one round trip
+        request_items = {
+            TRIP_STATES_TABLE_NAME: {
+                "Keys": [{"tripId": save_req.tripId}],
+                **TripState.projection("tripId", "userId", "startLocation", "startTime", "endTime", "mode", "finalItinerary")
+            },
+            TRIPS_TABLE_NAME: {
+                "Keys": [{"tripId": save_req.tripId}],
+                **projection("tripId", "userId", "createdAt")
+            }
+        }
+        items = {TRIP_STATES_TABLE_NAME: [], TRIPS_TABLE_NAME: []}
+        
+        # Retry keys DynamoDB left unprocessed (only happens under throttling)
+        for _ in range(3):
+            response = get_ddb_resource().batch_get_item(RequestItems=request_items)
+            for table_name, table_items in response.get("Responses", {}).items():
+                items[table_name].extend(table_items)
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+        else:
+            raise RuntimeError("Could not read trip after retrying unprocessed keys")
         
-        if "Item" not in response:
+        if not items[TRIP_STATES_TABLE_NAME]:
             return lambda_response(404, {"error": "Trip not found", "code": "NOT_FOUND"})
         
-        trip_state = TripState.from_item(response["Item"])
+        trip_state = TripState.from_item(items[TRIP_STATES_TABLE_NAME][0])
         
         # Validate ownership
         validate_trip_ownership(trip_state.userId, user_id)
@@ -67,6 +83,13 @@ def handler(event, context):
         
         final_itinerary = trip_state.finalItinerary
         
+        # Re-saving keeps the original createdAt so the trip keeps its place in the user's list
+        created_at = None
+        if items[TRIPS_TABLE_NAME]:
+            existing = items[TRIPS_TABLE_NAME][0]
+            validate_trip_ownership(existing["userId"], user_id)
+            created_at = existing.get("createdAt")
+        
         # Create trip entity
         trip = Trip(
             tripId=save_req.tripId,
@@ -80,18 +103,48 @@ def handler(event, context):
             order=final_itinerary.get("order", []),
             finishBy=final_itinerary.get("finishBy", "00:00"),
             totalTravelMinutes=final_itinerary.get("totalTravelMinutes", 0),
-            confidence=final_itinerary.get("confidence", "Medium")
+            confidence=final_itinerary.get("confidence", "Medium"),
+            createdAt=created_at
         )
         
-        # Save to Trips table
-        trips_table.put_item(Item=trip.to_item())
+        # Write the trip and mark the draft saved atomically, as long as the draft
+        # still exists and still belongs to the caller
+        try:
+            get_ddb_resource().meta.client.transact_write_items(
+                TransactItems=[
+                    {
+                        "Put": {
+                            "TableName": TRIPS_TABLE_NAME,
+                            "Item": serialize_item(trip.to_item())
+                        }
+                    },
+                    {
+                        "Update": {
+                            "TableName": TRIP_STATES_TABLE_NAME,
+                            "Key": serialize_item({"tripId": save_req.tripId}),
+                            "UpdateExpression": "SET #status = :saved, lastUpdatedAt = :now",
+                            "ConditionExpression": "attribute_exists(tripId) AND userId = :uid",
+                            "ExpressionAttributeNames": {"#status": "status"},
+                            "ExpressionAttributeValues": serialize_item({
+                                ":saved": "SAVED",
+                                ":now": datetime.utcnow().isoformat(),
+                                ":uid": user_id
+                            })
+                        }
+                    }
+                ]
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "TransactionCanceledException":
+                return lambda_response(409, {"error": "Trip changed while saving, please retry", "code": "CONFLICT"})
+            raise
         
         info(f"Saved trip: {save_req.tripId}")
         
-        return lambda_response(200, {
-            "tripId": save_req.tripId,
-            "message": "Trip saved successfully"
-        })
+        return lambda_response(200, SaveResponse(
+            tripId=save_req.tripId,
+            message="Trip saved successfully"
+        ).model_dump_json())
     
     except ValidationError as e:
         return lambda_response(400, {"error": e.message, "code": e.code})
@@ -2,6 +2,7 @@
 Centralized configuration for environment variables.
 """
 import os
+from functools import lru_cache
 
 # AWS Configuration
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-2')
@@ -9,8 +10,11 @@ AWS_ACCOUNT_ID = os.getenv('AWS_ACCOUNT_ID', '391163822329')
 
 # DynamoDB Table Names
 USERS_TABLE_NAME = os.getenv('USERS_TABLE_NAME', 'Users')
+USERS_EMAIL_INDEX_NAME = os.getenv('USERS_EMAIL_INDEX_NAME', 'email-index')
 TRIPS_TABLE_NAME = os.getenv('TRIPS_TABLE_NAME', 'Trips')
 TRIP_STATES_TABLE_NAME = os.getenv('TRIP_STATES_TABLE_NAME', 'TripStates')
+# Unset leaves the ETA leg cache disabled
+ETA_CACHE_TABLE_NAME = os.getenv('ETA_CACHE_TABLE_NAME')
 
 # Cognito Configuration
 COGNITO_USER_POOL_ID = os.getenv('COGNITO_USER_POOL_ID')
@@ -27,19 +31,20 @@ INRIX_BASE_URL = os.getenv('INRIX_BASE_URL', 'https://api.inrix.com/v1')
 # API Gateway
 API_GATEWAY_URL = os.getenv('API_GATEWAY_URL')
 
+# Open outbound connections during cold start instead of on the first request
+PREWARM_CONNECTIONS = os.getenv('PREWARM_CONNECTIONS', 'true').lower() == 'true'
+
 # Validation
+@lru_cache(maxsize=1)
 def validate_config():
-    """Validate that required environment variables are set."""
-    required_vars = [
-        'COGNITO_USER_POOL_ID',
-        'COGNITO_CLIENT_ID',
-        'INRIX_SECRET_ARN'
-    ]
+    """Validate that required environment variables are set (checked once per process)."""
+    required_vars = {
+        'COGNITO_USER_POOL_ID': COGNITO_USER_POOL_ID,
+        'COGNITO_CLIENT_ID': COGNITO_CLIENT_ID,
+        'INRIX_SECRET_ARN': INRIX_SECRET_ARN
+    }
     
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
+    missing_vars = [var for var, value in required_vars.items() if not value]
     
     if missing_vars:
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
@@ -1,19 +1,14 @@
 """Authentication handlers."""
 
-import json
-import boto3
-import os
-from src.models.dto import SignupRequest, LoginRequest, AuthResponse
+from src.config import USERS_TABLE_NAME, USERS_EMAIL_INDEX_NAME
+from src.models.dto import SignupRequest, LoginRequest, AuthResponse, SIGNUP_REQ_ADAPTER, LOGIN_REQ_ADAPTER
 from src.models.dynamo import User
-from src.utils.auth import get_auth_service, lambda_response, lambda_handler_decorator
+from src.utils.auth import get_auth_service, get_token_sub, lambda_response, lambda_handler_decorator
+from src.utils.aws import get_table
 from src.utils.errors import UnauthorizedError, ValidationError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-west-2"))
-users_table = dynamodb.Table(os.getenv("USERS_TABLE_NAME", "Users"))
-
-
 @lambda_handler_decorator
 def signup_handler(event, context):
     """
@@ -26,10 +21,8 @@ def signup_handler(event, context):
         AuthResponse with tokens and user ID
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        
         # Validate request
-        signup_req = SignupRequest(**body)
+        signup_req = SIGNUP_REQ_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Create user in Cognito
         auth_service = get_auth_service()
@@ -40,7 +33,7 @@ def signup_handler(event, context):
             userId=cognito_user["userId"],
             email=signup_req.email
         )
-        users_table.put_item(Item=user.to_item())
+        get_table(USERS_TABLE_NAME).put_item(Item=user.to_item())
         
         info(f"User signed up: {signup_req.email}")
         
@@ -70,26 +63,31 @@ def login_handler(event, context):
         AuthResponse with tokens and user ID
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        
         # Validate request
-        login_req = LoginRequest(**body)
+        login_req = LOGIN_REQ_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Authenticate with Cognito
         auth_service = get_auth_service()
         auth_result = auth_service.login_user(login_req.email, login_req.password)
         
-        # Get user from DynamoDB
-        response = users_table.scan(
-            FilterExpression="email = :email",
-            ExpressionAttributeValues={":email": login_req.email}
-        )
-        
-        items = response.get("Items", [])
-        if not items:
-            raise UnauthorizedError("User not found")
-        
-        user_id = items[0]["userId"]
+        # userId is the Cognito sub; only fall back to the email GSI if the IdToken lacked it
+        user_id = get_token_sub(auth_result.get("idToken"))
+        if not user_id:
+            # Deferred so the common path never loads boto3's conditions module
+            from boto3.dynamodb.conditions import Key
+            
+            response = get_table(USERS_TABLE_NAME).query(
+                IndexName=USERS_EMAIL_INDEX_NAME,
+                KeyConditionExpression=Key("email").eq(login_req.email),
+                ProjectionExpression="userId",
+                Limit=1
+            )
+            
+            items = response.get("Items", [])
+            if not items:
+                raise UnauthorizedError("User not found")
+            
+            user_id = items[0]["userId"]
         
         info(f"User logged in: {login_req.email}")
         
@@ -1,19 +1,18 @@
 """Build ETA matrix handler."""
 
-import json
-import os
-import boto3
-from src.models.dto import TripIdOnly
+from concurrent.futures import ThreadPoolExecutor
+from src.config import TRIP_STATES_TABLE_NAME
+from src.models.dto import EtaResponse, TRIP_ID_ADAPTER
 from src.models.dynamo import TripState
+from src.services.eta_cache import get_eta_leg_cache
 from src.services.inrix import get_inrix_client
-from src.services.time_utils import get_timezone_from_coords
 from src.utils.auth import lambda_response, get_auth_service, lambda_handler_decorator, validate_trip_ownership
+from src.utils.aws import get_table, prewarm
 from src.utils.errors import ValidationError, NotFoundError
 from src.utils.logger import info, error
 
 
-dynamodb = boto3.resource("dynamodb", region_name=os.getenv("AWS_REGION", "us-west-2"))
-trip_states_table = dynamodb.Table(os.getenv("TRIP_STATES_TABLE_NAME", "TripStates"))
+prewarm(lambda: get_inrix_client().warmup())
 
 
 @lambda_handler_decorator
@@ -28,8 +27,7 @@ def handler(event, context):
         EtaResponse with matrix and incidents
     """
     try:
-        body = json.loads(event.get("body", "{}"))
-        trip_req = TripIdOnly(**body)
+        trip_req = TRIP_ID_ADAPTER.validate_json(event.get("body") or "{}")
         
         # Extract user ID
         auth_service = get_auth_service()
@@ -39,7 +37,11 @@ def handler(event, context):
             return lambda_response(401, {"error": "Unauthorized", "code": "UNAUTHORIZED"})
         
         # Load trip state
-        response = trip_states_table.get_item(Key={"tripId": trip_req.tripId})
+        trip_states_table = get_table(TRIP_STATES_TABLE_NAME)
+        response = trip_states_table.get_item(
+            Key={"tripId": trip_req.tripId},
+            **TripState.projection("tripId", "userId", "startTime", "endTime", "mode", "geocodedStops", "classifiedStops")
+        )
         
         if "Item" not in response:
             return lambda_response(404, {"error": "Trip not found", "code": "NOT_FOUND"})
@@ -60,45 +62,56 @@ def handler(event, context):
         if not start_coords:
             return lambda_response(400, {"error": "Start coordinates not found", "code": "VALIDATION_ERROR"})
         
-        # Extract stop coords
-        stops_coords = [{"name": stop["name"], "lat": stop["lat"], "lon": stop["lon"]} 
-                       for stop in trip_state.classifiedStops]
-        
-        # Build ETA matrix
-        eta_matrix = inrix_client.build_eta_matrix(
-            start_coords=start_coords,
-            stops_coords=stops_coords,
-            start_time_iso=trip_state.startTime,
-            end_time_iso=trip_state.endTime,
-            mode=trip_state.mode
-        )
+        # Classified stops already carry name/lat/lon, which is all the matrix and bbox read
+        stops_coords = trip_state.classifiedStops
+        
+        # Calculate rough bbox from coordinates in a single pass
+        min_lat = max_lat = start_coords["lat"]
+        min_lon = max_lon = start_coords["lon"]
+        for stop in stops_coords:
+            lat, lon = stop["lat"], stop["lon"]
+            if lat < min_lat:
+                min_lat = lat
+            elif lat > max_lat:
+                max_lat = lat
+            if lon < min_lon:
+                min_lon = lon
+            elif lon > max_lon:
+                max_lon = lon
+        
+        bbox = (min_lat, min_lon, max_lat, max_lon)
+        time_window = (trip_state.startTime, trip_state.endTime)
         
-        # Get incidents (simplified - would need bbox)
-        incidents = []
-        try:
-            # Calculate rough bbox from coordinates
-            lats = [stop["lat"] for stop in stops_coords] + [start_coords["lat"]]
-            lons = [stop["lon"] for stop in stops_coords] + [start_coords["lon"]]
+        # Incidents don't depend on the matrix, so fetch them while the matrix is built
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            incidents_future = executor.submit(inrix_client.get_incidents, bbox, time_window)
             
-            bbox = (min(lats), min(lons), max(lats), max(lons))
-            time_window = (trip_state.startTime, trip_state.endTime)
+            # Build ETA matrix
+            eta_matrix = inrix_client.build_eta_matrix(
+                start_coords=start_coords,
+                stops_coords=stops_coords,
+                start_time_iso=trip_state.startTime,
+                end_time_iso=trip_state.endTime,
+                mode=trip_state.mode,
+                leg_cache=get_eta_leg_cache()
+            )
             
-            incidents = inrix_client.get_incidents(bbox, time_window)
-        except Exception as e:
-            error(f"Failed to fetch incidents: {str(e)}")
+            incidents = []
+            try:
+                incidents = incidents_future.result()
+            except Exception as e:
+                error(f"Failed to fetch incidents: {str(e)}")
         
         # Update trip state
-        trip_state.etaMatrix = eta_matrix
-        trip_state.incidents = incidents
-        trip_states_table.put_item(Item=trip_state.to_item())
+        trip_state.update_attrs(trip_states_table, owner_id=user_id, etaMatrix=eta_matrix, incidents=incidents)
         
         info(f"Built ETA matrix for trip: {trip_req.tripId}")
         
-        return lambda_response(200, {
-            "tripId": trip_req.tripId,
-            "etaMatrix": eta_matrix,
-            "incidents": incidents
-        })
+        return lambda_response(200, EtaResponse(
+            tripId=trip_req.tripId,
+            etaMatrix=eta_matrix,
+            incidents=incidents
+        ).model_dump_json())
     
     except ValidationError as e:
         return lambda_response(400, {"error": e.message, "code": e.code})
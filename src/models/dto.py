@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 
 
 # Authentication
@@ -116,3 +116,11 @@ class SaveResponse(BaseModel):
     tripId: str = Field(..., description="Trip ID")
     message: str = Field(..., description="Success message")
 
+
+# Request adapters, built once per container. validate_json parses the raw
+# request body in pydantic-core instead of json.loads + Model(**body).
+SIGNUP_REQ_ADAPTER = TypeAdapter(SignupRequest)
+LOGIN_REQ_ADAPTER = TypeAdapter(LoginRequest)
+INIT_REQ_ADAPTER = TypeAdapter(InitRequest)
+TRIP_ID_ADAPTER = TypeAdapter(TripIdOnly)
+SAVE_REQ_ADAPTER = TypeAdapter(SaveRequest)
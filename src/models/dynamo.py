@@ -1,14 +1,112 @@
 """DynamoDB entity models."""
 
-import ulid
+from __future__ import annotations
+
+import zlib
+import orjson
+from ulid import monotonic as ulid_mono
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from decimal import Decimal
+from botocore.exceptions import ClientError
+
+from src.utils.errors import NotFoundError
+
+
+def projection(*attributes: str) -> Dict[str, Any]:
+    """
+    Build get_item kwargs that fetch only the given attributes.
+    
+    Args:
+        *attributes: Attribute names to return
+    
+    Returns:
+        ProjectionExpression and ExpressionAttributeNames kwargs
+    """
+    names = {f"#p{i}": attr for i, attr in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names
+    }
+
+
+def to_decimal(value: float) -> Decimal:
+    """
+    Convert a float to the Decimal boto3 stores.
+    
+    Goes through str() so 12.3 is stored as 12.3 rather than its exact binary
+    expansion; whole numbers (most minute counts) skip the string round-trip.
+    """
+    if value.is_integer():
+        return Decimal(int(value))
+    return Decimal(str(value))
+
+
+def to_dynamo_value(value: Any) -> Any:
+    """Recursively convert floats to Decimal, the only number type boto3 accepts."""
+    if isinstance(value, float):
+        return to_decimal(value)
+    if isinstance(value, dict):
+        return {k: to_dynamo_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo_value(v) for v in value]
+    return value
+
+
+def pack_blob(value: Any) -> bytes:
+    """Serialize a sub-document to compressed JSON bytes for a Binary attribute."""
+    # Values read back from legacy map attributes carry Decimals
+    return zlib.compress(orjson.dumps(value, default=float))
+
+
+def unpack_blob(blob: Any) -> Any:
+    """Inverse of pack_blob; accepts bytes or a boto3 Binary."""
+    return orjson.loads(zlib.decompress(getattr(blob, "value", blob)))
+
+
+# Marks a required attribute in a _FIELDS table
+_REQUIRED = object()
+
+
+def _fields_from_item(item: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    """
+    Build constructor kwargs from a DynamoDB item using a field table.
+    
+    Args:
+        item: DynamoDB item
+        fields: Tuple of (attribute, default, converter). A callable default is
+            used as a factory; converter (or None) is applied to present values.
+    
+    Returns:
+        Dictionary of attribute -> value
+    
+    Raises:
+        KeyError: If a required attribute is missing
+    """
+    kwargs = {}
+    for attr, default, convert in fields:
+        value = item.get(attr, _REQUIRED)
+        if value is _REQUIRED:
+            if default is _REQUIRED:
+                raise KeyError(attr)
+            value = default() if callable(default) else default
+        elif convert is not None:
+            value = convert(value)
+        kwargs[attr] = value
+    return kwargs
 
 
 class User:
     """User entity."""
     
+    __slots__ = ("userId", "email", "createdAt")
+    
+    _FIELDS = (
+        ("userId", _REQUIRED, None),
+        ("email", _REQUIRED, None),
+        ("createdAt", None, None)
+    )
+    
     def __init__(
         self,
         userId: str,
@@ -22,11 +120,7 @@ class User:
     @classmethod
     def from_item(cls, item: Dict[str, Any]) -> "User":
         """Create User from DynamoDB item."""
-        return cls(
-            userId=item["userId"],
-            email=item["email"],
-            createdAt=item.get("createdAt")
-        )
+        return cls(**_fields_from_item(item, cls._FIELDS))
     
     def to_item(self) -> Dict[str, Any]:
         """Convert User to DynamoDB item."""
@@ -40,6 +134,30 @@ class User:
 class Trip:
     """Saved trip entity."""
     
+    __slots__ = (
+        "tripId", "userId", "title", "startTime", "endTime", "mode", "startLocation",
+        "itinerary", "order", "finishBy", "totalTravelMinutes", "confidence", "createdAt"
+    )
+    
+    _FIELDS = (
+        ("tripId", _REQUIRED, None),
+        ("userId", _REQUIRED, None),
+        ("title", _REQUIRED, None),
+        ("startTime", _REQUIRED, None),
+        ("endTime", _REQUIRED, None),
+        ("mode", _REQUIRED, None),
+        ("startLocation", _REQUIRED, None),
+        ("itinerary", list, None),
+        ("order", list, None),
+        ("finishBy", None, None),
+        ("totalTravelMinutes", 0.0, float),
+        ("confidence", "Medium", None),
+        ("createdAt", None, None)
+    )
+    
+    # Attributes read by project_item
+    PROJECTED_ATTRIBUTES = ("tripId", "order", "itinerary", "totalTravelMinutes", "confidence", "finishBy")
+    
     def __init__(
         self,
         tripId: str,
@@ -73,21 +191,29 @@ class Trip:
     @classmethod
     def from_item(cls, item: Dict[str, Any]) -> "Trip":
         """Create Trip from DynamoDB item."""
-        return cls(
-            tripId=item["tripId"],
-            userId=item["userId"],
-            title=item["title"],
-            startTime=item["startTime"],
-            endTime=item["endTime"],
-            mode=item["mode"],
-            startLocation=item["startLocation"],
-            itinerary=item.get("itinerary", []),
-            order=item.get("order", []),
-            finishBy=item.get("finishBy"),
-            totalTravelMinutes=float(item.get("totalTravelMinutes", 0)),
-            confidence=item.get("confidence", "Medium"),
-            createdAt=item.get("createdAt")
-        )
+        return cls(**_fields_from_item(item, cls._FIELDS))
+    
+    @staticmethod
+    def project_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the API view of a saved trip straight from its DynamoDB item.
+        
+        Read-only endpoints use this instead of from_item so no Trip is built.
+        
+        Args:
+            item: DynamoDB item holding at least PROJECTED_ATTRIBUTES
+        
+        Returns:
+            Trip dictionary in the PlanResponse shape
+        """
+        return {
+            "tripId": item["tripId"],
+            "order": item.get("order", []),
+            "itinerary": item.get("itinerary", []),
+            "totalTravelMinutes": float(item.get("totalTravelMinutes", 0)),
+            "confidence": item.get("confidence", "Medium"),
+            "finishBy": item.get("finishBy")
+        }
     
     def to_item(self) -> Dict[str, Any]:
         """Convert Trip to DynamoDB item."""
@@ -101,18 +227,72 @@ class Trip:
             "endTime": self.endTime,
             "mode": self.mode,
             "startLocation": self.startLocation,
-            "itinerary": self.itinerary,
+            "itinerary": to_dynamo_value(self.itinerary),
             "order": self.order,
             "finishBy": self.finishBy,
-            "totalTravelMinutes": Decimal(str(self.totalTravelMinutes)),
+            "totalTravelMinutes": to_decimal(float(self.totalTravelMinutes)),
             "confidence": self.confidence,
             "createdAt": self.createdAt
         }
 
 
+def _empty_default(name: str, factory: type) -> property:
+    """
+    Property over the None-able slot "_<name>" that reads as an empty container when unset.
+    
+    The empty container is built on read and never stored, so entities loaded
+    without the attribute don't allocate one.
+    """
+    slot = f"_{name}"
+    
+    def fget(self):
+        value = getattr(self, slot)
+        return factory() if value is None else value
+    
+    def fset(self, value):
+        setattr(self, slot, value)
+    
+    return property(fget, fset)
+
+
 class TripState:
     """Draft/intermediate trip state."""
     
+    __slots__ = (
+        "tripId", "userId", "startLocation", "startTime", "endTime", "mode", "_rawStops",
+        "_geocodedStops", "_classifiedStops", "_etaMatrix", "_incidents", "finalItinerary",
+        "lastUpdatedAt"
+    )
+    
+    # Absent containers stay None underneath and read as empty
+    rawStops = _empty_default("rawStops", list)
+    geocodedStops = _empty_default("geocodedStops", list)
+    classifiedStops = _empty_default("classifiedStops", list)
+    etaMatrix = _empty_default("etaMatrix", dict)
+    incidents = _empty_default("incidents", list)
+    
+    # Large sub-documents are stored as compressed Binary attributes instead of
+    # nested maps; items written before this used the plain attribute names
+    BLOB_ATTRIBUTES = {
+        "classifiedStops": "classifiedStopsBlob",
+        "etaMatrix": "etaMatrixBlob",
+        "incidents": "incidentsBlob",
+        "finalItinerary": "finalItineraryBlob"
+    }
+    
+    # Plain attributes; blob-backed ones are read through _read_document
+    _FIELDS = (
+        ("tripId", _REQUIRED, None),
+        ("userId", _REQUIRED, None),
+        ("startLocation", "", None),
+        ("startTime", None, None),
+        ("endTime", None, None),
+        ("mode", None, None),
+        ("rawStops", None, None),
+        ("geocodedStops", None, None),
+        ("lastUpdatedAt", None, None)
+    )
+    
     def __init__(
         self,
         tripId: str,
@@ -135,37 +315,56 @@ class TripState:
         self.startTime = startTime
         self.endTime = endTime
         self.mode = mode
-        self.rawStops = rawStops or []
-        self.geocodedStops = geocodedStops or []
-        self.classifiedStops = classifiedStops or []
-        self.etaMatrix = etaMatrix or {}
-        self.incidents = incidents or []
+        self._rawStops = rawStops
+        self._geocodedStops = geocodedStops
+        self._classifiedStops = classifiedStops
+        self._etaMatrix = etaMatrix
+        self._incidents = incidents
         self.finalItinerary = finalItinerary
         self.lastUpdatedAt = lastUpdatedAt or datetime.utcnow().isoformat()
     
     @classmethod
     def generate_id(cls) -> str:
         """Generate a new trip ID."""
-        return f"t_{ulid.new().str}"
+        return f"t_{ulid_mono.new().str}"
+    
+    @classmethod
+    def generate_id_with_ts(cls) -> Tuple[str, str]:
+        """
+        Generate a new trip ID together with the creation time it encodes.
+        
+        Returns:
+            Tuple of (trip ID, naive UTC ISO timestamp in the lastUpdatedAt format)
+        """
+        trip_ulid = ulid_mono.new()
+        created_at = trip_ulid.timestamp().datetime.replace(tzinfo=None).isoformat()
+        return f"t_{trip_ulid.str}", created_at
+    
+    @classmethod
+    def projection(cls, *attributes: str) -> Dict[str, Any]:
+        """Build get_item projection kwargs, including blob and legacy names for sub-documents."""
+        names = []
+        for attr in attributes:
+            names.append(attr)
+            if attr in cls.BLOB_ATTRIBUTES:
+                names.append(cls.BLOB_ATTRIBUTES[attr])
+        return projection(*names)
+    
+    @classmethod
+    def _read_document(cls, item: Dict[str, Any], attr: str, default: Any) -> Any:
+        """Read a sub-document from its blob, falling back to the legacy map attribute."""
+        blob = item.get(cls.BLOB_ATTRIBUTES[attr])
+        if blob is not None:
+            return unpack_blob(blob)
+        return item.get(attr, default)
     
     @classmethod
     def from_item(cls, item: Dict[str, Any]) -> "TripState":
         """Create TripState from DynamoDB item."""
-        return cls(
-            tripId=item["tripId"],
-            userId=item["userId"],
-            startLocation=item.get("startLocation", ""),
-            startTime=item.get("startTime"),
-            endTime=item.get("endTime"),
-            mode=item.get("mode"),
-            rawStops=item.get("rawStops", []),
-            geocodedStops=item.get("geocodedStops", []),
-            classifiedStops=item.get("classifiedStops", []),
-            etaMatrix=item.get("etaMatrix", {}),
-            incidents=item.get("incidents", []),
-            finalItinerary=item.get("finalItinerary"),
-            lastUpdatedAt=item.get("lastUpdatedAt")
-        )
+        kwargs = _fields_from_item(item, cls._FIELDS)
+        for attr in cls.BLOB_ATTRIBUTES:
+            kwargs[attr] = cls._read_document(item, attr, None)
+        return cls(**kwargs)
     
     def to_item(self) -> Dict[str, Any]:
         """Convert TripState to DynamoDB item."""
@@ -179,28 +378,78 @@ class TripState:
             "lastUpdatedAt": self.lastUpdatedAt
         }
         
-        if self.rawStops:
-            item["rawStops"] = self.rawStops
-        if self.geocodedStops:
-            item["geocodedStops"] = self.geocodedStops
-        if self.classifiedStops:
-            item["classifiedStops"] = self.classifiedStops
-        if self.etaMatrix:
-            item["etaMatrix"] = self.etaMatrix
-        if self.incidents:
-            item["incidents"] = self.incidents
-        if self.finalItinerary:
-            item["finalItinerary"] = self.finalItinerary
+        if self._rawStops:
+            item["rawStops"] = self._rawStops
+        if self._geocodedStops:
+            item["geocodedStops"] = to_dynamo_value(self._geocodedStops)
+        for attr, blob_attr in self.BLOB_ATTRIBUTES.items():
+            value = getattr(self, attr)
+            if value:
+                item[blob_attr] = pack_blob(value)
         
         return item
     
+    def update_attrs(self, table, owner_id: str = None, **changes: Any) -> None:
+        """
+        Persist only the given attributes with UpdateItem instead of rewriting the item.
+        
+        Args:
+            table: TripStates table resource
+            owner_id: If set, only update while the stored trip still belongs to this user
+            **changes: Attribute names and their new values
+        
+        Raises:
+            NotFoundError: If the trip is gone or no longer owned by owner_id
+        """
+        self.lastUpdatedAt = datetime.utcnow().isoformat()
+        changes["lastUpdatedAt"] = self.lastUpdatedAt
+        
+        names = {}
+        values = {}
+        assignments = []
+        removals = []
+        for i, (attr, value) in enumerate(changes.items()):
+            setattr(self, attr, value)
+            names[f"#a{i}"] = attr
+            if attr in self.BLOB_ATTRIBUTES:
+                # Write the blob and drop any legacy map copy of the same document
+                names[f"#b{i}"] = self.BLOB_ATTRIBUTES[attr]
+                values[f":v{i}"] = pack_blob(value)
+                assignments.append(f"#b{i} = :v{i}")
+                removals.append(f"#a{i}")
+            else:
+                values[f":v{i}"] = to_dynamo_value(value)
+                assignments.append(f"#a{i} = :v{i}")
+        
+        update_expression = "SET " + ", ".join(assignments)
+        if removals:
+            update_expression += " REMOVE " + ", ".join(removals)
+        
+        update_kwargs = {}
+        if owner_id is not None:
+            values[":owner"] = owner_id
+            update_kwargs["ConditionExpression"] = "userId = :owner"
+        
+        try:
+            table.update_item(
+                Key={"tripId": self.tripId},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                **update_kwargs
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise NotFoundError("Trip not found")
+            raise
+    
     @property
     def start_coords(self) -> Optional[Dict[str, float]]:
         """Get start location coordinates."""
-        if not self.geocodedStops:
+        if not self._geocodedStops:
             return None
         # First geocoded stop is assumed to be the start location
-        first_stop = self.geocodedStops[0] if self.geocodedStops else None
+        first_stop = self._geocodedStops[0]
         if first_stop:
             return {"lat": first_stop["lat"], "lon": first_stop["lon"]}
         return None
@@ -1,21 +1,187 @@
 """Amazon Bedrock client for LLM invocations."""
 
 import json
+import orjson
 import os
-import boto3
-from typing import Dict, List, Optional
+import re
+import string
+import threading
+import time
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
+from src.utils.aws import get_client
 from src.utils.logger import info, error, warning
 from src.utils.errors import LLMError
 
 
+# Per-stop classification fans out over this many threads; the client pool is
+# sized to match and adaptive retries back off on Bedrock throttling
+CLASSIFY_MAX_WORKERS = 8
+BEDROCK_CONFIG = Config(
+    max_pool_connections=CLASSIFY_MAX_WORKERS,
+    retries={"mode": "adaptive", "max_attempts": 4},
+    tcp_keepalive=True
+)
+
+# Output token budgets sized from observed replies. One classification is
+# ~80-150 tokens; a planned itinerary costs ~70 tokens per stop (itinerary
+# entry plus its "order" slot) on top of the fixed fields.
+CLASSIFY_MAX_TOKENS = 180
+CLASSIFY_BATCH_TOKENS_PER_STOP = 200
+PLAN_BASE_TOKENS = 200
+PLAN_TOKENS_PER_STOP = 80
+PLAN_MIN_TOKENS = 400
+PLAN_MAX_TOKENS = 2000
+
+# A reply cut off at max_tokens is retried once with this much more room;
+# the same budget would just truncate again
+TRUNCATED_RETRY_TOKEN_FACTOR = 2
+
+# JSON object in an LLM reply: the body of a ```/```json block, or else
+# everything from the first "{" to the last "}"
+_JSON_OBJECT_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```|(\{.*\})", re.DOTALL)
+
+# Prompts from spec (sections 5.1 and 5.2). Static text lives at module level
+# so every request sends byte-identical prefixes, which prompt caching needs.
+_CLASSIFY_SYSTEM_PROMPT = """You classify real-world places. Use the provided name and coordinates only.
+Return structured JSON with: category, bestTimeWindow, reason, and do not include extra fields.
+Categories to choose from (pick one): pier, museum, viewpoint, cafe, park, landmark, beach, restaurant, other.
+bestTimeWindow must be a local time range like "17:00–19:00".
+Be decisive. If unsure, pick the closest category based on typical tourist use."""
+
+_CLASSIFY_BATCH_SYSTEM_PROMPT = """You classify real-world places. Use the provided names and coordinates only.
+For each numbered place return an object with: category, bestTimeWindow, reason, and do not include extra fields.
+Categories to choose from (pick one): pier, museum, viewpoint, cafe, park, landmark, beach, restaurant, other.
+bestTimeWindow must be a local time range like "17:00–19:00".
+Be decisive. If unsure, pick the closest category based on typical tourist use.
+Return a JSON array with exactly one object per place, in the same order as the input."""
+
+_PLAN_SYSTEM_PROMPT = """You are an expert itinerary planner. Use ONLY the data provided.
+You must:
+- Visit all spots exactly once.
+- Start at startTime and finish by endTime.
+- Minimize total travel minutes using the ETA matrix.
+- Prefer scheduling spots near their bestTimeWindow.
+- Avoid routes/times with incidents when reasonable.
+- DO NOT invent coordinates or times not implied by ETA and the window.
+- Return STRICT JSON in the schema provided."""
+
+_PLAN_USER_TEMPLATE = string.Template("""StartTime: $start_time
+EndTime: $end_time
+Mode: $mode
+StartPoint: { "lat": $start_lat, "lon": $start_lon }
+
+Spots (all must be visited):
+$stops_json
+
+ETA Matrix (minutes):
+$eta_matrix_json
+
+Incidents (if any):
+$incidents_json
+
+Return JSON in this schema:
+{
+  "order": ["<spotName>", "..."],
+  "itinerary": [
+    {
+      "spot": "<spotName>",
+      "lat": <number>,
+      "lon": <number>,
+      "arrival": "HH:MM",
+      "reason": "<= 20 words, grounded in provided ETA/best-time/incident data>"
+    }
+  ],
+  "totalTravelMinutes": <number>,
+  "confidence": "High|Medium|Low",
+  "finishBy": "HH:MM"
+}
+
+Rules:
+- "lat" and "lon" must match the input spots; do not create new coordinates.
+- "arrival" must be local time and within [startTime, endTime].
+- Sum of travel and minimum stay should fit within the window. If not, choose the best subset that fits and explicitly skip the least valuable spot(s) (closest duplicates, low desirability).
+- Keep reasons short and factual (no fluff).""")
+
+# Bedrock error codes worth another attempt; anything else the service
+# returns (validation, access denied, unknown model, ...) fails the same way twice
+_RETRIABLE_ERROR_CODES = frozenset({
+    "ThrottlingException",
+    "ModelTimeoutException",
+    "ModelNotReadyException",
+    "ServiceUnavailableException",
+    "InternalServerException"
+})
+
+
+class _TruncatedResponseError(LLMError):
+    """Raised when Claude stopped at max_tokens, so the reply is incomplete."""
+
+
+def _should_retry(exc: Exception, attempt: int) -> bool:
+    """
+    Decide whether an LLM call is worth retrying, backing off first on throttling.
+    
+    Failures that didn't come from the Bedrock API (unparseable or incomplete
+    model output) are retried, since a stricter prompt often fixes them.
+    
+    Args:
+        exc: Exception raised by the attempt
+        attempt: Zero-based attempt number
+    
+    Returns:
+        True if the caller should retry
+    """
+    cause = exc.__cause__ if isinstance(exc.__cause__, ClientError) else exc
+    if not isinstance(cause, ClientError):
+        return True
+    
+    code = cause.response.get("Error", {}).get("Code")
+    if code not in _RETRIABLE_ERROR_CODES:
+        return False
+    if code == "ThrottlingException":
+        time.sleep(0.2 * 2 ** attempt)
+    return True
+
+
+# Classifications already produced by this container. A place's category and
+# best time window don't change between trips, so repeats skip Bedrock.
+_classification_cache = TTLCache(maxsize=4096, ttl=86400)
+_classification_cache_lock = threading.Lock()
+
+
+def _classification_key(name: str, lat: float, lon: float, city: str = None) -> Tuple:
+    """Cache key for a POI: normalized name, coordinates rounded to ~11 m, city."""
+    return (name.strip().lower(), round(float(lat), 4), round(float(lon), 4), (city or "").lower())
+
+
+def _get_cached_classification(key: Tuple) -> Optional[Dict]:
+    """Return a copy of a cached classification, or None."""
+    with _classification_cache_lock:
+        result = _classification_cache.get(key)
+    return dict(result) if result is not None else None
+
+
+def _cache_classification(key: Tuple, result: Dict) -> None:
+    """Store a copy so callers can't mutate the cached entry."""
+    with _classification_cache_lock:
+        _classification_cache[key] = dict(result)
+
+
 class BedrockService:
     """Service for invoking Bedrock LLM models."""
     
     def __init__(self, region: str = None):
         self.region = region or os.getenv("AWS_REGION", "us-west-2")
         self.model_id = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
-        self.bedrock_runtime = boto3.client("bedrock-runtime", region_name=self.region)
+        self.bedrock_runtime = get_client("bedrock-runtime", self.region, BEDROCK_CONFIG)
+        # Latency-optimized inference is only offered for some models, so it is
+        # opted into per function through the environment
+        self.latency_optimized = os.getenv("BEDROCK_LATENCY_OPTIMIZED", "false").lower() == "true"
     
     def classify_poi(self, name: str, lat: float, lon: float, city: str = None) -> Dict:
         """
@@ -33,13 +199,12 @@ class BedrockService:
         Raises:
             LLMError: If LLM invocation fails
         """
-        # Build prompt from spec (section 5.1)
-        system_prompt = """You classify real-world places. Use the provided name and coordinates only.
-Return structured JSON with: category, bestTimeWindow, reason, and do not include extra fields.
-Categories to choose from (pick one): pier, museum, viewpoint, cafe, park, landmark, beach, restaurant, other.
-bestTimeWindow must be a local time range like "17:00–19:00".
-Be decisive. If unsure, pick the closest category based on typical tourist use."""
+        cache_key = _classification_key(name, lat, lon, city)
+        cached = _get_cached_classification(cache_key)
+        if cached is not None:
+            return cached
         
+        # Prompt from spec (section 5.1)
         user_prompt = f"""Name: "{name}"
 Coordinates: {lat}, {lon}
 Return JSON only."""
@@ -47,13 +212,15 @@ Return JSON only."""
         if city:
             user_prompt += f"\nCity: {city}"
         
+        max_tokens = CLASSIFY_MAX_TOKENS
+        
         # Try up to 2 times
         for attempt in range(2):
             try:
                 response = self._invoke_claude(
-                    system_prompt=system_prompt,
+                    system_prompt=_CLASSIFY_SYSTEM_PROMPT,
                     user_prompt=user_prompt,
-                    max_tokens=500
+                    max_tokens=max_tokens
                 )
                 
                 # Parse response
@@ -69,19 +236,111 @@ Return JSON only."""
                 result["stayMin"] = result.get("stayMin", 45)
                 
                 info(f"Classified POI: {name} -> {result['category']}")
+                _cache_classification(cache_key, result)
                 return result
             
             except Exception as e:
-                if attempt == 0:
+                if attempt == 0 and _should_retry(e, attempt):
                     warning(f"LLM classification failed (attempt {attempt + 1}): {str(e)}, retrying...")
+                    if isinstance(e, _TruncatedResponseError):
+                        max_tokens *= TRUNCATED_RETRY_TOKEN_FACTOR
                     # Retry with stricter prompt
                     user_prompt += "\n\nReturn JSON only; no prose."
                 else:
-                    error(f"LLM classification failed after 2 attempts: {str(e)}")
+                    error(f"LLM classification failed after {attempt + 1} attempt(s): {str(e)}")
                     raise LLMError(f"Failed to classify POI '{name}': {str(e)}")
         
         raise LLMError(f"Failed to classify POI after 2 attempts")
     
+    def classify_pois_batch(self, stops: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Classify several POIs with a single Bedrock invocation.
+        
+        Stops the batched response leaves out or gets wrong are classified
+        individually, concurrently, with classify_poi.
+        
+        Args:
+            stops: List of stops with name, lat, lon
+        
+        Returns:
+            List aligned with stops; each entry is a classification dict
+            (category, bestTimeWindow, reason, stayMin) or None if that stop
+            could not be classified
+        """
+        if not stops:
+            return []
+        
+        results: List[Optional[Dict]] = [None] * len(stops)
+        keys = [_classification_key(stop["name"], stop["lat"], stop["lon"]) for stop in stops]
+        
+        # A place listed more than once is classified once and fanned back out
+        positions: Dict[Tuple, List[int]] = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(key, []).append(i)
+        unique = [indexes[0] for indexes in positions.values()]
+        
+        # Only places this container hasn't classified recently go to Bedrock
+        pending = []
+        for i in unique:
+            results[i] = _get_cached_classification(keys[i])
+            if results[i] is None:
+                pending.append(i)
+        
+        if pending:
+            places = "\n".join(
+                f'{n + 1}. Name: "{stops[i]["name"]}" Coordinates: {stops[i]["lat"]}, {stops[i]["lon"]}'
+                for n, i in enumerate(pending)
+            )
+            user_prompt = f"""{places}
+Return a JSON array only."""
+            
+            try:
+                response = self._invoke_claude(
+                    system_prompt=_CLASSIFY_BATCH_SYSTEM_PROMPT,
+                    user_prompt=user_prompt,
+                    max_tokens=min(4000, CLASSIFY_BATCH_TOKENS_PER_STOP * len(pending))
+                )
+                parsed = self._parse_json_array_response(response)
+                
+                if len(parsed) == len(pending):
+                    for i, result in zip(pending, parsed):
+                        if isinstance(result, dict) and all(
+                            field in result for field in ("category", "bestTimeWindow", "reason")
+                        ):
+                            result["stayMin"] = result.get("stayMin", 45)
+                            results[i] = result
+                            _cache_classification(keys[i], result)
+                else:
+                    warning(f"Batch classification returned {len(parsed)} results for {len(pending)} stops")
+            
+            except Exception as e:
+                warning(f"Batch classification failed: {str(e)}, falling back to per-stop calls")
+        
+        missing = [i for i in unique if results[i] is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(CLASSIFY_MAX_WORKERS, len(missing))) as executor:
+                for i, result in zip(missing, executor.map(lambda i: self._classify_or_none(stops[i]), missing)):
+                    results[i] = result
+        
+        for first, *duplicates in positions.values():
+            if results[first] is not None:
+                for i in duplicates:
+                    results[i] = dict(results[first])
+        
+        info(
+            f"Classified {sum(r is not None for r in results)}/{len(stops)} POIs "
+            f"({len(unique) - len(pending)} cached, {len(stops) - len(unique)} duplicates)"
+        )
+        return results
+    
+    def _classify_or_none(self, stop: Dict) -> Optional[Dict]:
+        """Classify a single stop, returning None instead of raising."""
+        try:
+            return self.classify_poi(name=stop["name"], lat=stop["lat"], lon=stop["lon"])
+        except Exception as e:
+            error(f"Failed to classify '{stop['name']}': {str(e)}")
+            return None
+    
     def plan_itinerary(
         self,
         start_time_iso: str,
@@ -112,70 +371,35 @@ Return JSON only."""
         Raises:
             LLMError: If LLM invocation fails
         """
-        # Build prompt from spec (section 5.2)
-        system_prompt = """You are an expert itinerary planner. Use ONLY the data provided.
-You must:
-- Visit all spots exactly once.
-- Start at startTime and finish by endTime.
-- Minimize total travel minutes using the ETA matrix.
-- Prefer scheduling spots near their bestTimeWindow.
-- Avoid routes/times with incidents when reasonable.
-- DO NOT invent coordinates or times not implied by ETA and the window.
-- Return STRICT JSON in the schema provided."""
-        
-        # Format classified stops
-        stops_json = json.dumps(classified_stops, indent=2)
-        
-        # Format ETA matrix
-        eta_matrix_json = json.dumps(eta_matrix, indent=2)
+        # Compact JSON: indentation only adds input tokens. Legacy items read
+        # from DynamoDB may still carry Decimals, hence default=float
+        stops_json = orjson.dumps(classified_stops, default=float).decode()
+        eta_matrix_json = orjson.dumps(eta_matrix, default=float).decode()
+        incidents_json = orjson.dumps(incidents, default=float).decode()
         
-        # Format incidents
-        incidents_json = json.dumps(incidents, indent=2)
+        user_prompt = _PLAN_USER_TEMPLATE.substitute(
+            start_time=start_time_iso,
+            end_time=end_time_iso,
+            mode=mode,
+            start_lat=start_point["lat"],
+            start_lon=start_point["lon"],
+            stops_json=stops_json,
+            eta_matrix_json=eta_matrix_json,
+            incidents_json=incidents_json
+        )
         
-        user_prompt = f"""StartTime: {start_time_iso}
-EndTime: {end_time_iso}
-Mode: {mode}
-StartPoint: {{ "lat": {start_point['lat']}, "lon": {start_point['lon']} }}
-
-Spots (all must be visited):
-{stops_json}
-
-ETA Matrix (minutes):
-{eta_matrix_json}
-
-Incidents (if any):
-{incidents_json}
-
-Return JSON in this schema:
-{{
-  "order": ["<spotName>", "..."],
-  "itinerary": [
-    {{
-      "spot": "<spotName>",
-      "lat": <number>,
-      "lon": <number>,
-      "arrival": "HH:MM",
-      "reason": "<= 20 words, grounded in provided ETA/best-time/incident data>"
-    }}
-  ],
-  "totalTravelMinutes": <number>,
-  "confidence": "High|Medium|Low",
-  "finishBy": "HH:MM"
-}}
-
-Rules:
-- "lat" and "lon" must match the input spots; do not create new coordinates.
-- "arrival" must be local time and within [startTime, endTime].
-- Sum of travel and minimum stay should fit within the window. If not, choose the best subset that fits and explicitly skip the least valuable spot(s) (closest duplicates, low desirability).
-- Keep reasons short and factual (no fluff)."""
+        max_tokens = min(
+            PLAN_MAX_TOKENS,
+            max(PLAN_MIN_TOKENS, PLAN_BASE_TOKENS + PLAN_TOKENS_PER_STOP * len(classified_stops))
+        )
         
         # Try up to 2 times
         for attempt in range(2):
             try:
-                response = self._invoke_claude(
-                    system_prompt=system_prompt,
+                response = self._invoke_claude_json_stream(
+                    system_prompt=_PLAN_SYSTEM_PROMPT,
                     user_prompt=user_prompt,
-                    max_tokens=2000
+                    max_tokens=max_tokens
                 )
                 
                 # Parse response
@@ -195,16 +419,48 @@ Rules:
                 return result
             
             except Exception as e:
-                if attempt == 0:
+                if attempt == 0 and _should_retry(e, attempt):
                     warning(f"LLM planning failed (attempt {attempt + 1}): {str(e)}, retrying...")
+                    if isinstance(e, _TruncatedResponseError):
+                        max_tokens *= TRUNCATED_RETRY_TOKEN_FACTOR
                     # Retry with stricter prompt
                     user_prompt += "\n\nIMPORTANT: Return STRICT JSON only. No prose."
                 else:
-                    error(f"LLM planning failed after 2 attempts: {str(e)}")
+                    error(f"LLM planning failed after {attempt + 1} attempt(s): {str(e)}")
                     raise LLMError(f"Failed to plan itinerary: {str(e)}")
         
         raise LLMError("Failed to plan itinerary after 2 attempts")
     
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int
+    ) -> Tuple[Dict, Dict]:
+        """
+        Build the Anthropic request body and extra invoke kwargs.
+        
+        Returns:
+            Tuple of (request_body, invoke_kwargs)
+        """
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "system": system_prompt,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ]
+        }
+        
+        invoke_kwargs = {}
+        if self.latency_optimized:
+            invoke_kwargs["performanceConfigLatency"] = "optimized"
+        
+        return request_body, invoke_kwargs
+    
     def _invoke_claude(
         self,
         system_prompt: str,
@@ -213,24 +469,18 @@ Rules:
     ) -> str:
         """Invoke Claude model via Bedrock."""
         try:
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "system": system_prompt,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ]
-            }
+            request_body, invoke_kwargs = self._build_request(system_prompt, user_prompt, max_tokens)
             
             response = self.bedrock_runtime.invoke_model(
                 modelId=self.model_id,
-                body=json.dumps(request_body)
+                body=orjson.dumps(request_body),
+                **invoke_kwargs
             )
             
-            response_body = json.loads(response["body"].read())
+            response_body = orjson.loads(response["body"].read())
+            
+            if response_body.get("stop_reason") == "max_tokens":
+                raise _TruncatedResponseError(f"Response truncated at max_tokens ({max_tokens})")
             
             # Extract text from Claude response
             if "content" in response_body:
@@ -242,34 +492,127 @@ Rules:
             else:
                 raise LLMError("Invalid response format from Bedrock")
         
+        except LLMError:
+            raise
         except Exception as e:
-            raise LLMError(f"Bedrock invocation failed: {str(e)}")
+            raise LLMError(f"Bedrock invocation failed: {str(e)}") from e
+    
+    def _invoke_claude_json_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 1000
+    ) -> str:
+        """
+        Invoke Claude with response streaming and stop at the end of the first JSON object.
+        
+        Text deltas are scanned as they arrive; once the braces of the first
+        top-level object balance, the stream is closed so we don't wait for any
+        trailing prose. Braces inside JSON strings are ignored.
+        
+        Returns:
+            Response text up to and including the closing brace, or the full
+            text if no complete object was seen
+        
+        Raises:
+            LLMError: If the call fails, or (as _TruncatedResponseError) the
+                reply hit max_tokens before the object was complete
+        """
+        try:
+            request_body, invoke_kwargs = self._build_request(system_prompt, user_prompt, max_tokens)
+            
+            response = self.bedrock_runtime.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                body=orjson.dumps(request_body),
+                **invoke_kwargs
+            )
+            stream = response["body"]
+            
+            parts = []
+            depth = 0
+            started = False
+            in_string = False
+            escaped = False
+            stop_reason = None
+            
+            try:
+                for event in stream:
+                    chunk = event.get("chunk")
+                    if not chunk:
+                        continue
+                    
+                    payload = orjson.loads(chunk["bytes"])
+                    if payload.get("type") == "message_delta":
+                        stop_reason = payload.get("delta", {}).get("stop_reason")
+                        continue
+                    if payload.get("type") != "content_block_delta":
+                        continue
+                    text = payload.get("delta", {}).get("text", "")
+                    
+                    for i, char in enumerate(text):
+                        if in_string:
+                            if escaped:
+                                escaped = False
+                            elif char == "\\":
+                                escaped = True
+                            elif char == '"':
+                                in_string = False
+                        elif char == '"':
+                            in_string = started
+                        elif char == "{":
+                            depth += 1
+                            started = True
+                        elif char == "}" and started:
+                            depth -= 1
+                            if depth == 0:
+                                parts.append(text[:i + 1])
+                                return "".join(parts)
+                    
+                    parts.append(text)
+            finally:
+                stream.close()
+            
+            # The object never closed; if the budget ran out, say so rather
+            # than letting it surface as a JSON parse error
+            if stop_reason == "max_tokens":
+                raise _TruncatedResponseError(f"Response truncated at max_tokens ({max_tokens})")
+            
+            return "".join(parts)
+        
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Bedrock invocation failed: {str(e)}") from e
     
     def _parse_json_response(self, response: str) -> Dict:
         """Parse JSON response from LLM."""
         try:
-            # Try to extract JSON from response
+            # Prefer the object inside a markdown code block, else the outermost braces
+            match = _JSON_OBJECT_RE.search(response)
+            if match:
+                return orjson.loads(match.group(1) or match.group(2))
+            return orjson.loads(response.strip())
+        
+        except json.JSONDecodeError as e:
+            raise LLMError(f"Failed to parse JSON response: {str(e)}")
+    
+    def _parse_json_array_response(self, response: str) -> List:
+        """Parse a JSON array response from LLM."""
+        try:
             response = response.strip()
             
-            # Remove markdown code blocks if present
-            if response.startswith("```"):
-                # Find first and last ```
-                start_idx = response.find("```")
-                if start_idx != -1:
-                    response = response[start_idx + 3:]
-                    end_idx = response.find("```")
-                    if end_idx != -1:
-                        response = response[:end_idx]
+            # Take everything between the outermost brackets, which also
+            # drops markdown code fences and any surrounding prose
+            start_bracket = response.find("[")
+            end_bracket = response.rfind("]")
             
-            # Try to find JSON object
-            start_brace = response.find("{")
-            end_brace = response.rfind("}")
+            if start_bracket == -1 or end_bracket == -1:
+                raise LLMError("No JSON array in LLM response")
             
-            if start_brace != -1 and end_brace != -1:
-                json_str = response[start_brace:end_brace + 1]
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
+            result = orjson.loads(response[start_bracket:end_bracket + 1])
+            if not isinstance(result, list):
+                raise LLMError("LLM response is not a JSON array")
+            return result
         
         except json.JSONDecodeError as e:
             raise LLMError(f"Failed to parse JSON response: {str(e)}")
@@ -277,12 +620,15 @@ Rules:
 
 # Global instance
 _bedrock_service = None
+_bedrock_service_lock = threading.Lock()
 
 
 def get_bedrock_service() -> BedrockService:
     """Get global BedrockService instance."""
     global _bedrock_service
     if _bedrock_service is None:
-        _bedrock_service = BedrockService()
+        with _bedrock_service_lock:
+            if _bedrock_service is None:
+                _bedrock_service = BedrockService()
     return _bedrock_service
 
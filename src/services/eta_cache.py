@@ -0,0 +1,128 @@
+"""DynamoDB-backed cache of predicted ETA legs."""
+
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from src.config import ETA_CACHE_TABLE_NAME
+from src.models.dynamo import to_decimal
+from src.utils.aws import get_ddb_resource, get_table
+from src.utils.logger import info, warning
+
+
+class EtaLegCache:
+    """
+    Cache of INRIX ETAs keyed by (origin, destination, departure bucket, mode).
+    
+    Coordinates are rounded to 4 decimals (~11 m) and departures to 15-minute
+    buckets, so repeat trips through the same POIs reuse legs instead of calling
+    INRIX again. Entries expire through the table's TTL attribute.
+    """
+    
+    BUCKET_MINUTES = 15
+    BATCH_GET_LIMIT = 100
+    
+    def __init__(self, table_name: str = None, ttl_seconds: int = None):
+        self.table_name = table_name or ETA_CACHE_TABLE_NAME
+        self.ttl_seconds = ttl_seconds or int(os.getenv("ETA_CACHE_TTL_SECONDS", "3600"))
+        self.enabled = bool(self.table_name)
+        self.table = get_table(self.table_name) if self.enabled else None
+    
+    @classmethod
+    def make_key(
+        cls,
+        origin_lat: float,
+        origin_lon: float,
+        dest_lat: float,
+        dest_lon: float,
+        departure: datetime,
+        mode: str
+    ) -> str:
+        """Build the cache key for one leg."""
+        bucket = departure.replace(
+            minute=departure.minute - departure.minute % cls.BUCKET_MINUTES,
+            second=0,
+            microsecond=0
+        )
+        return (
+            f"{mode}|{float(origin_lat):.4f},{float(origin_lon):.4f}"
+            f"|{float(dest_lat):.4f},{float(dest_lon):.4f}|{bucket.isoformat()}"
+        )
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch cached legs.
+        
+        Args:
+            keys: Cache keys from make_key
+        
+        Returns:
+            Dictionary of key -> {meanMinutes, p80Minutes, incidentsCount} for hits
+        """
+        if not self.enabled or not keys:
+            return {}
+        
+        unique_keys = list(dict.fromkeys(keys))
+        now = int(time.time())
+        hits = {}
+        
+        try:
+            for i in range(0, len(unique_keys), self.BATCH_GET_LIMIT):
+                chunk = unique_keys[i:i + self.BATCH_GET_LIMIT]
+                response = get_ddb_resource().batch_get_item(
+                    RequestItems={self.table_name: {"Keys": [{"legKey": key} for key in chunk]}}
+                )
+                
+                # Unprocessed keys are treated as misses
+                for item in response.get("Responses", {}).get(self.table_name, []):
+                    # TTL deletion is lazy, so skip entries that have already expired
+                    if int(item.get("expiresAt", 0)) <= now:
+                        continue
+                    hits[item["legKey"]] = {
+                        "meanMinutes": float(item["meanMinutes"]),
+                        "p80Minutes": float(item["p80Minutes"]),
+                        "incidentsCount": int(item["incidentsCount"])
+                    }
+        except Exception as e:
+            warning(f"ETA cache lookup failed: {str(e)}")
+        
+        info(f"ETA cache hits: {len(hits)}/{len(unique_keys)}")
+        return hits
+    
+    def put_many(self, legs: Dict[str, Dict]) -> None:
+        """
+        Store freshly fetched legs.
+        
+        Args:
+            legs: Dictionary of key -> {meanMinutes, p80Minutes, incidentsCount}
+        """
+        if not self.enabled or not legs:
+            return
+        
+        expires_at = int(time.time()) + self.ttl_seconds
+        
+        try:
+            with self.table.batch_writer(overwrite_by_pkeys=["legKey"]) as batch:
+                for key, eta in legs.items():
+                    batch.put_item(Item={
+                        "legKey": key,
+                        "meanMinutes": to_decimal(float(eta["meanMinutes"])),
+                        "p80Minutes": to_decimal(float(eta["p80Minutes"])),
+                        "incidentsCount": eta["incidentsCount"],
+                        "expiresAt": expires_at
+                    })
+        except Exception as e:
+            warning(f"ETA cache write failed: {str(e)}")
+
+
+# Global instance
+_eta_leg_cache = None
+
+
+def get_eta_leg_cache() -> EtaLegCache:
+    """Get global EtaLegCache instance."""
+    global _eta_leg_cache
+    if _eta_leg_cache is None:
+        _eta_leg_cache = EtaLegCache()
+    return _eta_leg_cache
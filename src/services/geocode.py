@@ -1,20 +1,37 @@
 """Amazon Location Service wrapper for geocoding."""
 
 import os
-import boto3
-from typing import Dict, Optional
+import threading
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
+from src.utils.aws import get_client
 from src.utils.errors import GeocodeError
 from src.utils.logger import info, error
 
 
+# Location Service calls are I/O-bound, so batches fan out over threads
+GEOCODE_MAX_WORKERS = 8
+
+# Geocodes already resolved by this container, keyed by normalized address.
+# Places don't move, so the TTL only bounds staleness of the index data.
+_geocode_cache = TTLCache(maxsize=10000, ttl=7 * 86400)
+_geocode_cache_lock = threading.Lock()
+
+
+def _geocode_key(address: str) -> str:
+    """Cache key for an address: trimmed and lowercased."""
+    return address.strip().lower()
+
+
 class GeocodeService:
     """Service for geocoding addresses."""
     
     def __init__(self, region: str = None):
         self.region = region or os.getenv("AWS_REGION", "us-west-2")
         self.place_index_name = os.getenv("LOCATION_PLACE_INDEX_NAME")
-        self.location_client = boto3.client("location", region_name=self.region)
+        self.location_client = get_client("location", self.region)
     
     def geocode_address(self, address: str) -> Dict[str, any]:
         """
@@ -36,6 +53,13 @@ class GeocodeService:
         if address.lower() == "usecurrent":
             raise GeocodeError("Please provide an actual location, not 'useCurrent'")
         
+        cache_key = _geocode_key(address)
+        with _geocode_cache_lock:
+            cached = _geocode_cache.get(cache_key)
+        if cached is not None:
+            info(f"Geocode cache hit: {address}")
+            return dict(cached)
+        
         try:
             response = self.location_client.search_place_index_for_text(
                 IndexName=self.place_index_name,
@@ -57,6 +81,8 @@ class GeocodeService:
             }
             
             info(f"Geocoded: {address} -> {coords['lat']}, {coords['lon']}")
+            with _geocode_cache_lock:
+                _geocode_cache[cache_key] = dict(coords)
             return coords
         
         except self.location_client.exceptions.ValidationException as e:
@@ -69,15 +95,47 @@ class GeocodeService:
             error(f"Geocoding failed for '{address}': {str(e)}")
             raise GeocodeError(f"Failed to geocode address: {address}")
 
+    
+    def geocode_batch(self, addresses: List[str]) -> List[Optional[Dict[str, any]]]:
+        """
+        Geocode several addresses concurrently.
+        
+        Duplicate addresses are looked up once.
+        
+        Args:
+            addresses: Address strings or location names
+        
+        Returns:
+            Geocode result per address, in input order; None where geocoding failed
+        """
+        unique = list(dict.fromkeys(addresses))
+        if not unique:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(GEOCODE_MAX_WORKERS, len(unique))) as executor:
+            results = dict(zip(unique, executor.map(self._geocode_or_none, unique)))
+        
+        return [results[address] for address in addresses]
+    
+    def _geocode_or_none(self, address: str) -> Optional[Dict[str, any]]:
+        """Geocode one address for a batch; failures are already logged by geocode_address."""
+        try:
+            return self.geocode_address(address)
+        except GeocodeError:
+            return None
+
 
 # Global instance
 _geocode_service = None
+_geocode_service_lock = threading.Lock()
 
 
 def get_geocode_service() -> GeocodeService:
     """Get global GeocodeService instance."""
     global _geocode_service
     if _geocode_service is None:
-        _geocode_service = GeocodeService()
+        with _geocode_service_lock:
+            if _geocode_service is None:
+                _geocode_service = GeocodeService()
     return _geocode_service
 
@@ -1,16 +1,93 @@
 """INRIX API client for ETA and incidents."""
 
+import asyncio
 import os
+import threading
 import time
 import math
+import aiohttp
+import orjson
 import requests
-import pytz
-from typing import Dict, List, Optional
+from cachetools import TTLCache
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from src.utils.logger import info, error, warning
 from src.utils.errors import ExternalServiceError
 from src.utils.secrets import get_secrets_manager
+from src.services.time_utils import generate_time_bins, parse_iso_utc
+
+
+# Maximum INRIX requests in flight while building an ETA matrix; enough to
+# overlap round trips without tripping INRIX rate limits
+ETA_MAX_CONCURRENCY = 16
+
+# Predicted ETAs already fetched by this container, keyed by rounded (~1 m)
+# endpoints, departure and mode, so re-plans and retries skip the round-trip.
+# Straight-line fallbacks are never stored here.
+_eta_cache = TTLCache(maxsize=4096, ttl=3600)
+_eta_cache_lock = threading.Lock()
+
+
+def _eta_key(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    departure_time_iso: str,
+    mode: str
+) -> Tuple:
+    """Cache key for one predicted ETA."""
+    return (
+        round(float(origin_lat), 5), round(float(origin_lon), 5),
+        round(float(dest_lat), 5), round(float(dest_lon), 5),
+        departure_time_iso, mode
+    )
+
+
+def _get_cached_eta(key: Tuple) -> Optional[Dict[str, float]]:
+    """Return a copy of a cached ETA, or None."""
+    with _eta_cache_lock:
+        eta = _eta_cache.get(key)
+    return dict(eta) if eta is not None else None
+
+
+def _cache_eta(key: Tuple, eta: Dict[str, float]) -> None:
+    """Store a copy so callers can't mutate the cached entry."""
+    with _eta_cache_lock:
+        _eta_cache[key] = dict(eta)
+
+
+@lru_cache(maxsize=4096)
+def _straight_line_minutes(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    mode: str
+) -> float:
+    """Travel minutes over the great-circle distance at the mode's average speed."""
+    # Calculate distance (Haversine formula)
+    R = 6371  # Earth radius in km
+    
+    dlat = math.radians(dest_lat - origin_lat)
+    dlon = math.radians(dest_lon - origin_lon)
+    
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(origin_lat)) * math.cos(math.radians(dest_lat)) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    distance_km = R * c
+    
+    # Estimate travel time based on mode (average speeds)
+    if mode == "walk":
+        avg_speed_kmh = 5
+    elif mode == "drive":
+        avg_speed_kmh = 40
+    else:  # mix
+        avg_speed_kmh = 25
+    
+    return (distance_km / avg_speed_kmh) * 60
 
 
 class InrixClient:
@@ -20,21 +97,65 @@ class InrixClient:
         self.base_url = os.getenv("INRIX_BASE_URL", "https://api.inrix.com/v1")
         self.secrets_manager = get_secrets_manager()
         self._api_key = None
+        # Concurrent first calls (fan-out threads) share one Secrets Manager lookup
+        self._api_key_lock = threading.Lock()
+        
+        # One keep-alive session so synchronous calls reuse TCP/TLS connections;
+        # retries stay in our own loops
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Shared by the requests and aiohttp sessions; Authorization is added
+        # when the API key is first resolved
+        self.headers = {"Content-Type": "application/json"}
+        self.session.headers.update(self.headers)
+        
+        # Event loop and aiohttp session for the ETA matrix, kept for the
+        # container's life so warm invocations reuse DNS results and
+        # keep-alive connections; one matrix build runs on the loop at a time
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._http = None
+        self._http_loop = None
     
     @property
     def api_key(self) -> str:
         """Get INRIX API key from Secrets Manager."""
         if self._api_key is None:
-            self._api_key = self.secrets_manager.get_inrix_api_key()
-            if not self._api_key:
-                # Fallback to environment variable
-                self._api_key = os.getenv("INRIX_API_KEY")
+            with self._api_key_lock:
+                if self._api_key is None:
+                    api_key = self.secrets_manager.get_inrix_api_key()
+                    if not api_key:
+                        # Fallback to environment variable
+                        api_key = os.getenv("INRIX_API_KEY")
+                    
+                    # Headers go in before the key is published, so no caller
+                    # sees a key without the matching Authorization
+                    if api_key:
+                        self.headers["Authorization"] = f"Bearer {api_key}"
+                        self.session.headers["Authorization"] = self.headers["Authorization"]
+                    self._api_key = api_key
         
         if not self._api_key:
             raise ExternalServiceError("INRIX_API_KEY not found in Secrets Manager or environment")
         
         return self._api_key
     
+    def _get(self, url: str, params: Dict) -> requests.Response:
+        """GET through the shared session, whose default headers carry the Authorization."""
+        if self._api_key is None:
+            self.api_key
+        return self.session.get(url, params=params, timeout=10)
+    
+    def warmup(self) -> None:
+        """Load the API key from Secrets Manager ahead of the first INRIX call."""
+        try:
+            self.api_key
+        except ExternalServiceError:
+            pass
+    
     def get_predicted_eta(
         self,
         origin_lat: float,
@@ -58,6 +179,11 @@ class InrixClient:
         Returns:
             Dictionary with meanMinutes, p80Minutes, incidentsCount
         """
+        cache_key = _eta_key(origin_lat, origin_lon, dest_lat, dest_lon, departure_time_iso, mode)
+        cached = _get_cached_eta(cache_key)
+        if cached is not None:
+            return cached
+        
         max_retries = 3
         retry_delay = 1
         
@@ -65,52 +191,17 @@ class InrixClient:
             try:
                 # Call INRIX route API
                 url = f"{self.base_url}/routing/route"
-                params = {
-                    "origin": f"{origin_lat},{origin_lon}",
-                    "destination": f"{dest_lat},{dest_lon}",
-                    "departureTime": departure_time_iso,
-                    "provider": "inrix" if mode == "drive" else "here",
-                    "region": "us"
-                }
+                params = self._route_params(origin_lat, origin_lon, dest_lat, dest_lon, departure_time_iso, mode)
                 
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                response = requests.get(url, params=params, headers=headers, timeout=10)
+                response = self._get(url, params)
                 response.raise_for_status()
                 
-                data = response.json()
-                
-                # Parse INRIX response
-                route = data.get("routes", [{}])[0]
-                legs = route.get("legs", [])
-                
-                if not legs:
-                    raise ExternalServiceError("No route legs returned from INRIX")
-                
-                # Sum up durations from all legs
-                total_duration = 0
-                total_incidents = 0
-                
-                for leg in legs:
-                    duration = leg.get("duration", {}).get("value", 0)
-                    total_duration += duration
-                    total_incidents += len(leg.get("incidents", []))
-                
-                # Convert seconds to minutes
-                mean_minutes = total_duration / 60
-                # Estimate p80 (assuming 20% buffer for traffic)
-                p80_minutes = mean_minutes * 1.2
-                
-                return {
-                    "meanMinutes": mean_minutes,
-                    "p80Minutes": p80_minutes,
-                    "incidentsCount": total_incidents
-                }
+                # INRIX answers in UTF-8 JSON; orjson parses the raw bytes directly
+                eta = self._parse_route(orjson.loads(response.content))
+                _cache_eta(cache_key, eta)
+                return eta
             
-            except requests.RequestException as e:
+            except (requests.RequestException, orjson.JSONDecodeError) as e:
                 if attempt < max_retries - 1:
                     warning(f"INRIX API call failed (attempt {attempt + 1}): {str(e)}, retrying...")
                     time.sleep(retry_delay)
@@ -121,6 +212,109 @@ class InrixClient:
         
         return self._fallback_eta(origin_lat, origin_lon, dest_lat, dest_lon, mode)
     
+    async def _aget_eta(
+        self,
+        http: aiohttp.ClientSession,
+        origin_lat: float,
+        origin_lon: float,
+        dest_lat: float,
+        dest_lon: float,
+        departure_time_iso: str,
+        mode: str = "drive",
+        fallback: bool = True
+    ) -> Dict[str, float]:
+        """
+        Async counterpart of get_predicted_eta for matrix fan-out.
+        
+        Same request, parsing, retries and straight-line fallback, but on a
+        shared aiohttp session so many legs can be in flight at once. With
+        fallback=False the last error is raised instead, so the matrix build
+        can estimate all failed legs together.
+        """
+        cache_key = _eta_key(origin_lat, origin_lon, dest_lat, dest_lon, departure_time_iso, mode)
+        cached = _get_cached_eta(cache_key)
+        if cached is not None:
+            return cached
+        
+        max_retries = 3
+        retry_delay = 1
+        
+        for attempt in range(max_retries):
+            try:
+                url = f"{self.base_url}/routing/route"
+                params = self._route_params(origin_lat, origin_lon, dest_lat, dest_lon, departure_time_iso, mode)
+                
+                async with http.get(url, params=params) as response:
+                    response.raise_for_status()
+                    data = orjson.loads(await response.read())
+                
+                eta = self._parse_route(data)
+                _cache_eta(cache_key, eta)
+                return eta
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+                if attempt < max_retries - 1:
+                    warning(f"INRIX API call failed (attempt {attempt + 1}): {str(e)}, retrying...")
+                    await asyncio.sleep(retry_delay)
+                else:
+                    error(f"INRIX API call failed after {max_retries} attempts: {str(e)}")
+                    if not fallback:
+                        raise
+                    return self._fallback_eta(origin_lat, origin_lon, dest_lat, dest_lon, mode)
+        
+        return self._fallback_eta(origin_lat, origin_lon, dest_lat, dest_lon, mode)
+    
+    def _route_params(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        dest_lat: float,
+        dest_lon: float,
+        departure_time_iso: str,
+        mode: str
+    ) -> Dict[str, str]:
+        """Query parameters for the INRIX route API."""
+        return {
+            "origin": f"{origin_lat},{origin_lon}",
+            "destination": f"{dest_lat},{dest_lon}",
+            "departureTime": departure_time_iso,
+            "provider": "inrix" if mode == "drive" else "here",
+            "region": "us"
+        }
+    
+    def _parse_route(self, data: Dict) -> Dict[str, float]:
+        """
+        Parse an INRIX route response into ETA minutes.
+        
+        Raises:
+            ExternalServiceError: If the response has no route legs
+        """
+        route = data.get("routes", [{}])[0]
+        legs = route.get("legs", [])
+        
+        if not legs:
+            raise ExternalServiceError("No route legs returned from INRIX")
+        
+        # Sum up durations from all legs
+        total_duration = 0
+        total_incidents = 0
+        
+        for leg in legs:
+            duration = leg.get("duration", {}).get("value", 0)
+            total_duration += duration
+            total_incidents += len(leg.get("incidents", []))
+        
+        # Convert seconds to minutes
+        mean_minutes = total_duration / 60
+        # Estimate p80 (assuming 20% buffer for traffic)
+        p80_minutes = mean_minutes * 1.2
+        
+        return {
+            "meanMinutes": mean_minutes,
+            "p80Minutes": p80_minutes,
+            "incidentsCount": total_incidents
+        }
+    
     def get_incidents(self, bbox: tuple, time_window: tuple) -> List[Dict]:
         """
         Get incidents for a bounding box and time window.
@@ -140,15 +334,10 @@ class InrixClient:
                 "endTime": time_window[1]
             }
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self._get(url, params)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             incidents = []
             
             for incident in data.get("incidents", []):
@@ -172,7 +361,8 @@ class InrixClient:
         start_time_iso: str,
         end_time_iso: str,
         mode: str = "drive",
-        bin_interval_min: int = 30
+        bin_interval_min: int = 30,
+        leg_cache=None
     ) -> Dict:
         """
         Build ETA matrix for all pairs at multiple time bins.
@@ -184,58 +374,166 @@ class InrixClient:
             end_time_iso: End time (ISO8601)
             mode: Transport mode
             bin_interval_min: Time bin interval in minutes
+            leg_cache: Optional EtaLegCache; only legs it misses are fetched from INRIX
         
         Returns:
             Nested dictionary: {"A->B": {"11:00": {mean, p80, incidents}, ...}}
         """
-        from src.services.time_utils import generate_time_bins
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            
+            return self._loop.run_until_complete(self.build_eta_matrix_async(
+                start_coords,
+                stops_coords,
+                start_time_iso,
+                end_time_iso,
+                mode=mode,
+                bin_interval_min=bin_interval_min,
+                leg_cache=leg_cache
+            ))
+    
+    def _get_http(self) -> aiohttp.ClientSession:
+        """
+        Get the aiohttp session for the running loop, creating it on first use.
+        
+        Must be called from inside that loop. A session belongs to the loop it
+        was created on, so one left from a different loop is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.closed or self._http_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=ETA_MAX_CONCURRENCY, ttl_dns_cache=300)
+            # Per-socket limits, so time spent queued for a connector slot does not count
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=10)
+            self._http = aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout)
+            self._http_loop = loop
+        return self._http
+    
+    async def build_eta_matrix_async(
+        self,
+        start_coords: Dict[str, float],
+        stops_coords: List[Dict[str, float]],
+        start_time_iso: str,
+        end_time_iso: str,
+        mode: str = "drive",
+        bin_interval_min: int = 30,
+        leg_cache=None
+    ) -> Dict:
+        """
+        Build ETA matrix for all pairs at multiple time bins, fetching legs concurrently.
         
+        Every leg the cache misses is requested at once over the client's
+        long-lived aiohttp session; the connector caps how many are in flight.
+        
+        Args:
+            start_coords: Start location {lat, lon}
+            stops_coords: List of stop coordinates [{name, lat, lon}, ...]
+            start_time_iso: Start time (ISO8601)
+            end_time_iso: End time (ISO8601)
+            mode: Transport mode
+            bin_interval_min: Time bin interval in minutes
+            leg_cache: Optional EtaLegCache; only legs it misses are fetched from INRIX
+        
+        Returns:
+            Nested dictionary: {"A->B": {"11:00": {mean, p80, incidents}, ...}}
+        """
         # Generate time bins
         bins = generate_time_bins(start_time_iso, end_time_iso, bin_interval_min)
         
+        # Work out every (route, bin) leg and its cache key up front
+        legs = []
+        for stop in stops_coords:
+            route_key = f"Start->{stop['name']}"
+            for bin_time in bins:
+                departure_dt = self._parse_departure_time(start_time_iso, bin_time)
+                cache_key = None
+                if leg_cache is not None:
+                    cache_key = leg_cache.make_key(
+                        start_coords["lat"], start_coords["lon"],
+                        stop["lat"], stop["lon"],
+                        departure_dt, mode
+                    )
+                legs.append((route_key, bin_time, stop, departure_dt, cache_key))
+        
+        cached = leg_cache.get_many([leg[4] for leg in legs]) if leg_cache is not None else {}
+        fetched = {}
+        
         matrix = {}
+        misses = []
         
-        # For each stop
-        for stop in stops_coords:
-            stop_name = stop["name"]
-            route_key = f"Start->{stop_name}"
+        for leg in legs:
+            route_key, bin_time, stop, departure_dt, cache_key = leg
+            route = matrix.setdefault(route_key, {})
             
-            matrix[route_key] = {}
+            if cache_key in cached:
+                route[bin_time] = cached[cache_key]
+            else:
+                # Reserve the slot so bins keep their order whatever finishes first
+                route[bin_time] = None
+                misses.append(leg)
+        
+        if misses:
+            # Resolves the key, so self.headers carries the Authorization
+            self.api_key
+            http = self._get_http()
             
-            # For each time bin
-            for bin_time in bins:
-                try:
-                    # Calculate departure time for this bin
-                    departure_dt = self._parse_departure_time(start_time_iso, bin_time)
-                    departure_iso = departure_dt.isoformat()
-                    
-                    # Get ETA
-                    eta_data = self.get_predicted_eta(
+            results = await asyncio.gather(
+                *(
+                    self._aget_eta(
+                        http,
                         origin_lat=start_coords["lat"],
                         origin_lon=start_coords["lon"],
                         dest_lat=stop["lat"],
                         dest_lon=stop["lon"],
-                        departure_time_iso=departure_iso,
-                        mode=mode
+                        departure_time_iso=departure_dt.isoformat(),
+                        mode=mode,
+                        fallback=False
                     )
-                    
-                    matrix[route_key][bin_time] = eta_data
+                    for _, _, stop, departure_dt, _ in misses
+                ),
+                return_exceptions=True
+            )
+            
+            failed = []
+            for leg, eta_data in zip(misses, results):
+                route_key, bin_time, _, _, cache_key = leg
+                if isinstance(eta_data, Exception):
+                    warning(f"Failed to get ETA for {route_key} at {bin_time}: {str(eta_data)}")
+                    failed.append(leg)
+                    continue
                 
-                except Exception as e:
-                    warning(f"Failed to get ETA for {route_key} at {bin_time}: {str(e)}")
+                matrix[route_key][bin_time] = eta_data
+                if cache_key is not None:
+                    fetched[cache_key] = eta_data
+            
+            # A straight-line estimate doesn't depend on the departure bin, so
+            # it is computed once per stop and shared by all of its failed bins
+            if failed:
+                failed_stops = list({leg[0]: leg[2] for leg in failed}.items())
+                minutes = self._fallback_eta_batch(
+                    start_coords["lat"],
+                    start_coords["lon"],
+                    [stop for _, stop in failed_stops],
+                    mode
+                )
+                fallback_by_route = dict(zip((route_key for route_key, _ in failed_stops), minutes))
+                
+                for route_key, bin_time, _, _, _ in failed:
+                    eta_minutes = fallback_by_route[route_key]
                     matrix[route_key][bin_time] = {
-                        "meanMinutes": 0,
-                        "p80Minutes": 0,
+                        "meanMinutes": eta_minutes,
+                        "p80Minutes": eta_minutes * 1.2,
                         "incidentsCount": 0
                     }
         
+        if leg_cache is not None:
+            leg_cache.put_many(fetched)
+        
         return matrix
     
     def _parse_departure_time(self, start_iso: str, bin_time: str) -> datetime:
         """Parse departure time from start ISO and bin time string."""
-        start_dt = datetime.fromisoformat(start_iso.replace('Z', '+00:00'))
-        if start_dt.tzinfo is None:
-            start_dt = pytz.UTC.localize(start_dt)
+        start_dt = parse_iso_utc(start_iso)
         
         hour, minute = map(int, bin_time.split(":"))
         departure = start_dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
@@ -254,43 +552,78 @@ class InrixClient:
         Fallback ETA calculation using straight-line distance.
         This is used when INRIX API fails.
         """
-        import math
-        
-        # Calculate distance (Haversine formula)
-        R = 6371  # Earth radius in km
-        
-        dlat = math.radians(dest_lat - origin_lat)
-        dlon = math.radians(dest_lon - origin_lon)
-        
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(origin_lat)) * math.cos(math.radians(dest_lat)) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        distance_km = R * c
-        
-        # Estimate travel time based on mode (average speeds)
-        if mode == "walk":
-            avg_speed_kmh = 5
-        elif mode == "drive":
-            avg_speed_kmh = 40
-        else:  # mix
-            avg_speed_kmh = 25
-        
-        eta_minutes = (distance_km / avg_speed_kmh) * 60
+        # Rounded to ~1 m so repeat legs hit the memoized distance
+        eta_minutes = _straight_line_minutes(
+            round(float(origin_lat), 5), round(float(origin_lon), 5),
+            round(float(dest_lat), 5), round(float(dest_lon), 5),
+            mode
+        )
         
         return {
             "meanMinutes": eta_minutes,
             "p80Minutes": eta_minutes * 1.2,
             "incidentsCount": 0
         }
+    
+    def _fallback_eta_batch(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        dests: List[Dict[str, float]],
+        mode: str
+    ) -> List[float]:
+        """
+        Straight-line travel minutes from one origin to many destinations.
+        
+        Same estimate as _fallback_eta, with the origin's trig computed once.
+        
+        Args:
+            origin_lat: Origin latitude
+            origin_lon: Origin longitude
+            dests: Destinations with lat, lon
+            mode: Transport mode
+        
+        Returns:
+            Minutes per destination, in input order
+        """
+        R = 6371  # Earth radius in km
+        avg_speed_kmh = {"walk": 5, "drive": 40}.get(mode, 25)
+        
+        origin_lat_rad = math.radians(origin_lat)
+        origin_lon_rad = math.radians(origin_lon)
+        cos_origin_lat = math.cos(origin_lat_rad)
+        
+        minutes = []
+        for dest in dests:
+            dest_lat_rad = math.radians(dest["lat"])
+            dlat = dest_lat_rad - origin_lat_rad
+            dlon = math.radians(dest["lon"]) - origin_lon_rad
+            
+            a = math.sin(dlat/2)**2 + cos_origin_lat * math.cos(dest_lat_rad) * math.sin(dlon/2)**2
+            distance_km = 2 * R * math.asin(math.sqrt(a))
+            minutes.append((distance_km / avg_speed_kmh) * 60)
+        
+        return minutes
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop memoized ETAs and straight-line estimates."""
+        with _eta_cache_lock:
+            _eta_cache.clear()
+        _straight_line_minutes.cache_clear()
 
 
 # Global instance
 _inrix_client = None
+_inrix_client_lock = threading.Lock()
 
 
 def get_inrix_client() -> InrixClient:
     """Get global InrixClient instance."""
     global _inrix_client
     if _inrix_client is None:
-        _inrix_client = InrixClient()
+        with _inrix_client_lock:
+            if _inrix_client is None:
+                _inrix_client = InrixClient()
     return _inrix_client
 
@@ -1,17 +1,25 @@
 """Timezone and time conversion utilities."""
 
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List
 import pytz
-from timezonefinder import TimezoneFinder
+import re
 
 from src.utils.logger import warning
 
 
+# En dash, em dash, hyphen or "to", with any surrounding whitespace
+_TIME_RANGE_SEP_RE = re.compile(r"\s*(?:–|—|-|to)\s*")
+
+
 def get_timezone_from_coords(lat: float, lon: float) -> str:
     """
     Get timezone string from coordinates.
     
+    Lookups are cached per 0.1° cell (~10 km), so repeat trips in the same
+    area skip the polygon search.
+    
     Args:
         lat: Latitude
         lon: Longitude
@@ -19,7 +27,25 @@ def get_timezone_from_coords(lat: float, lon: float) -> str:
     Returns:
         Timezone string (e.g., "America/Los_Angeles")
     """
-    tf = TimezoneFinder()
+    return _timezone_at(round(float(lat), 1), round(float(lon), 1))
+
+
+@lru_cache(maxsize=1)
+def _get_tf() -> "TimezoneFinder":
+    """
+    Get the TimezoneFinder shared by this container.
+    
+    Building one loads the timezone polygon data, so it happens once, on first
+    lookup; handlers that never resolve a timezone don't import it at all.
+    """
+    from timezonefinder import TimezoneFinder
+    return TimezoneFinder()
+
+
+@lru_cache(maxsize=4096)
+def _timezone_at(lat: float, lon: float) -> str:
+    """Resolve the timezone for rounded coordinates."""
+    tf = _get_tf()
     tz_name = tf.timezone_at(lat=lat, lng=lon)
     
     if not tz_name:
@@ -29,6 +55,33 @@ def get_timezone_from_coords(lat: float, lon: float) -> str:
     return tz_name
 
 
+@lru_cache(maxsize=64)
+def _tz(name: str) -> pytz.BaseTzInfo:
+    """Get a pytz timezone by name, skipping the registry lookup on repeats."""
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=256)
+def parse_iso_utc(iso_str: str) -> datetime:
+    """
+    Parse an ISO8601 string (with or without "Z") into an aware datetime.
+    
+    Naive values are taken as UTC. Results are cached, since the same trip
+    start/end strings are parsed repeatedly across the ETA and validate paths.
+    
+    Args:
+        iso_str: ISO8601 datetime string
+    
+    Returns:
+        Timezone-aware datetime
+    """
+    # fromisoformat accepts the "Z" suffix itself on Python 3.11+
+    dt = datetime.fromisoformat(iso_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
 def iso_to_local_hhmm(iso_str: str, tz_name: str) -> str:
     """
     Convert ISO8601 datetime to local HH:MM string.
@@ -41,22 +94,14 @@ def iso_to_local_hhmm(iso_str: str, tz_name: str) -> str:
         HH:MM format string
     """
     try:
-        # Parse ISO string (may or may not have timezone info)
-        if 'T' in iso_str:
-            dt = datetime.fromisoformat(iso_str.replace('Z', '+00:00'))
-        else:
-            dt = datetime.fromisoformat(iso_str)
-        
-        # If datetime is naive, assume UTC
-        if dt.tzinfo is None:
-            dt = pytz.UTC.localize(dt)
+        # Parse ISO string (may or may not have timezone info; naive is UTC)
+        dt = parse_iso_utc(iso_str)
         
         # Convert to target timezone
-        target_tz = pytz.timezone(tz_name)
-        local_dt = dt.astimezone(target_tz)
+        local_dt = dt.astimezone(_tz(tz_name))
         
         # Format as HH:MM
-        return local_dt.strftime("%H:%M")
+        return f"{local_dt.hour:02d}:{local_dt.minute:02d}"
     
     except Exception as e:
         warning(f"Failed to convert ISO to local time: {str(e)}")
@@ -76,21 +121,22 @@ def generate_time_bins(start_iso: str, end_iso: str, interval_min: int = 30) ->
         List of time strings in HH:MM format
     """
     # Parse start and end times
-    start_dt = datetime.fromisoformat(start_iso.replace('Z', '+00:00'))
-    if start_dt.tzinfo is None:
-        start_dt = pytz.UTC.localize(start_dt)
+    start_dt = parse_iso_utc(start_iso)
+    end_dt = parse_iso_utc(end_iso)
     
-    end_dt = datetime.fromisoformat(end_iso.replace('Z', '+00:00'))
-    if end_dt.tzinfo is None:
-        end_dt = pytz.UTC.localize(end_dt)
+    span_seconds = (end_dt - start_dt).total_seconds()
+    if span_seconds < 0:
+        return []
     
-    # Generate bins
-    bins = []
-    current = start_dt
+    # Bins are whole minutes past the start, so plain integer math replaces
+    # stepping a datetime; wraps past midnight like the clock would
+    start_min = start_dt.hour * 60 + start_dt.minute
+    count = int(span_seconds // (interval_min * 60)) + 1
     
-    while current <= end_dt:
-        bins.append(current.strftime("%H:%M"))
-        current += timedelta(minutes=interval_min)
+    bins = []
+    for offset in range(start_min, start_min + count * interval_min, interval_min):
+        hour, minute = divmod(offset % 1440, 60)
+        bins.append(f"{hour:02d}:{minute:02d}")
     
     return bins
 
@@ -105,15 +151,15 @@ def parse_time_range(time_range_str: str) -> tuple[str, str]:
     Returns:
         Tuple of (start_time, end_time)
     """
-    # Handle various separators
-    for sep in ['–', '-', '—', 'to']:
-        if sep in time_range_str:
-            parts = time_range_str.split(sep)
-            if len(parts) == 2:
-                return parts[0].strip(), parts[1].strip()
+    time_range_str = time_range_str.strip()
+    
+    # Split on any supported separator in one pass
+    parts = _TIME_RANGE_SEP_RE.split(time_range_str)
+    if len(parts) == 2:
+        return parts[0], parts[1]
     
     # If no separator, assume single time
-    return time_range_str.strip(), time_range_str.strip()
+    return time_range_str, time_range_str
 
 
 def calculate_trip_duration_minutes(start_iso: str, end_iso: str) -> int:
@@ -127,13 +173,8 @@ def calculate_trip_duration_minutes(start_iso: str, end_iso: str) -> int:
     Returns:
         Duration in minutes
     """
-    start_dt = datetime.fromisoformat(start_iso.replace('Z', '+00:00'))
-    if start_dt.tzinfo is None:
-        start_dt = pytz.UTC.localize(start_dt)
-    
-    end_dt = datetime.fromisoformat(end_iso.replace('Z', '+00:00'))
-    if end_dt.tzinfo is None:
-        end_dt = pytz.UTC.localize(end_dt)
+    start_dt = parse_iso_utc(start_iso)
+    end_dt = parse_iso_utc(end_iso)
     
     duration = end_dt - start_dt
     return int(duration.total_seconds() / 60)
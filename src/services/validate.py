@@ -1,13 +1,22 @@
 """Itinerary validation logic."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
-import pytz
 
+from src.services.time_utils import parse_iso_utc
 from src.utils.logger import warning, error
 from src.utils.errors import ValidationError
 
 
+# Fields every itinerary item must carry
+_REQUIRED_ITEM_FIELDS = frozenset(("spot", "lat", "lon", "arrival"))
+
+# Allowed drift between planned and known coordinates (degrees, ~11 m),
+# squared so the check needs no sqrt
+_COORD_TOLERANCE = 0.0001
+_COORD_TOLERANCE_SQ = _COORD_TOLERANCE ** 2
+
+
 def validate_itinerary(
     itinerary: List[Dict],
     known_stops: List[Dict],
@@ -34,13 +43,8 @@ def validate_itinerary(
     
     # Parse time bounds
     try:
-        start_dt = datetime.fromisoformat(start_time_iso.replace('Z', '+00:00'))
-        if start_dt.tzinfo is None:
-            start_dt = pytz.UTC.localize(start_dt)
-        
-        end_dt = datetime.fromisoformat(end_time_iso.replace('Z', '+00:00'))
-        if end_dt.tzinfo is None:
-            end_dt = pytz.UTC.localize(end_dt)
+        start_dt = parse_iso_utc(start_time_iso)
+        end_dt = parse_iso_utc(end_time_iso)
     except Exception as e:
         return False, f"Invalid time format: {str(e)}"
     
@@ -55,24 +59,26 @@ def validate_itinerary(
     
     for i, item in enumerate(itinerary):
         # Check required fields
-        if not all(k in item for k in ["spot", "lat", "lon", "arrival"]):
+        if not _REQUIRED_ITEM_FIELDS <= item.keys():
             return False, f"Itinerary item {i} missing required fields"
         
         # Validate coordinates match known stops
         spot_name = item["spot"]
-        if spot_name not in known_map:
-            warning(f"Spot '{spot_name}' not in known stops")
-        
         known_stop = known_map.get(spot_name)
-        if known_stop:
-            expected_lat = known_stop["lat"]
-            expected_lon = known_stop["lon"]
+        if known_stop is None:
+            warning(f"Spot '{spot_name}' not in known stops")
+        else:
+            lat = item["lat"]
+            lon = item["lon"]
+            dlat = lat - known_stop["lat"]
+            dlon = lon - known_stop["lon"]
             
             # Allow small tolerance for floating point
-            if abs(item["lat"] - expected_lat) > 0.0001:
-                return False, f"Coordinates mismatch for '{spot_name}': lat {item['lat']} != {expected_lat}"
-            if abs(item["lon"] - expected_lon) > 0.0001:
-                return False, f"Coordinates mismatch for '{spot_name}': lon {item['lon']} != {expected_lon}"
+            if dlat * dlat + dlon * dlon > _COORD_TOLERANCE_SQ:
+                return False, (
+                    f"Coordinates mismatch for '{spot_name}': "
+                    f"({lat}, {lon}) != ({known_stop['lat']}, {known_stop['lon']})"
+                )
         
         # Check for duplicates
         if spot_name in visited_names:
@@ -98,8 +104,7 @@ def validate_itinerary(
             return False, f"Invalid arrival time '{item['arrival']}': {str(e)}"
     
     # Check all stops are visited
-    known_names = set(known_map.keys())
-    missing = known_names - visited_names
+    missing = known_map.keys() - visited_names
     if missing:
         warning(f"Not all stops visited: {missing}")
         # Note: This is a warning, not an error, as planner may skip some stops
@@ -107,10 +112,33 @@ def validate_itinerary(
     return True, ""
 
 
+def _hhmm_to_minutes(hhmm: str) -> int:
+    """
+    Convert an "HH:MM" (or "H:MM") string to minutes after midnight.
+    
+    Raises:
+        ValueError: If the string is not a valid HH:MM time
+    """
+    # Tolerate a single-digit hour ("9:30")
+    padded = "0" + hhmm if len(hhmm) == 4 else hhmm
+    if len(padded) != 5 or padded[2] != ":" or not (padded[:2] + padded[3:]).isdigit() or not padded.isascii():
+        raise ValueError(f"expected HH:MM, got '{hhmm}'")
+    
+    hour = (ord(padded[0]) - 48) * 10 + (ord(padded[1]) - 48)
+    minute = (ord(padded[3]) - 48) * 10 + (ord(padded[4]) - 48)
+    if hour > 23 or minute > 59:
+        raise ValueError(f"invalid time '{hhmm}'")
+    
+    return hour * 60 + minute
+
+
 def _parse_arrival_time(arrival_str: str, start_dt: datetime, end_dt: datetime) -> datetime:
     """
     Parse arrival time string into datetime.
     
+    Times earlier in the day than the start are taken to be after midnight,
+    so overnight itineraries keep increasing arrival times.
+    
     Args:
         arrival_str: HH:MM format string
         start_dt: Start datetime for reference
@@ -118,18 +146,18 @@ def _parse_arrival_time(arrival_str: str, start_dt: datetime, end_dt: datetime)
     
     Returns:
         Parsed datetime
+    
+    Raises:
+        ValueError: If arrival_str is not a valid HH:MM time
     """
-    try:
-        # Parse HH:MM
-        hour, minute = map(int, arrival_str.split(":"))
-        
-        # Use same date/timezone as start
-        arrival_dt = start_dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        
-        return arrival_dt
+    minutes = _hhmm_to_minutes(arrival_str)
     
-    except Exception as e:
-        raise ValueError(f"Failed to parse arrival time: {str(e)}")
+    # Use same date/timezone as start
+    arrival_dt = start_dt.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+    if minutes < start_dt.hour * 60 + start_dt.minute:
+        arrival_dt += timedelta(days=1)
+    
+    return arrival_dt
 
 
 def recompute_finish_by(itinerary: List[Dict], stay_minutes: int = 45) -> str:
@@ -149,12 +177,8 @@ def recompute_finish_by(itinerary: List[Dict], stay_minutes: int = 45) -> str:
     last_item = itinerary[-1]
     
     try:
-        # Parse last arrival time
-        last_arrival_str = last_item["arrival"]
-        hour, minute = map(int, last_arrival_str.split(":"))
-        
-        # Add stay duration
-        total_minutes = hour * 60 + minute + stay_minutes
+        # Parse last arrival time and add stay duration
+        total_minutes = _hhmm_to_minutes(last_item["arrival"]) + stay_minutes
         finish_hour = (total_minutes // 60) % 24
         finish_minute = total_minutes % 60
         
@@ -1,28 +1,65 @@
 """JWT validation and Cognito helpers."""
 
 import os
-import json
-import boto3
-import bcrypt
-from functools import wraps
-from typing import Dict, Optional
+import base64
+import orjson
+from decimal import Decimal
+from functools import lru_cache, wraps
+from typing import Dict, Optional, Union
 
 from src.utils.errors import UnauthorizedError
-from src.utils.logger import error, info
+from src.utils.logger import error, flush_logs, info, set_request_id
+
+
+@lru_cache(maxsize=1)
+def _cognito_config() -> "Config":
+    """Get the botocore Config for the Cognito client, built once per container."""
+    from botocore.config import Config
+    return Config(
+        tcp_keepalive=True,
+        max_pool_connections=10,
+        retries={"mode": "standard", "max_attempts": 2}
+    )
 
 
 class AuthService:
     """Service for handling authentication."""
     
     def __init__(self):
-        self.cognito_client = boto3.client("cognito-idp", region_name=os.getenv("AWS_REGION", "us-west-2"))
+        self._cognito_client = None
         self.user_pool_id = os.getenv("COGNITO_USER_POOL_ID")
         self.client_id = os.getenv("COGNITO_CLIENT_ID")
+        # Modeled Cognito exception classes, resolved once with the client.
+        # An empty tuple matches nothing in an except clause until then.
+        self.NotAuthorized = ()
+        self.UsernameExists = ()
+    
+    @property
+    def cognito_client(self):
+        """Cognito client, created on first use."""
+        if self._cognito_client is None:
+            # Imported here so handlers that never call Cognito (e.g. health) skip boto3
+            from src.utils.aws import get_client
+            
+            # The shared session caches clients per config object, so every
+            # AuthService reuses the same client instead of loading a new one
+            client = get_client(
+                "cognito-idp",
+                os.getenv("AWS_REGION", "us-west-2"),
+                _cognito_config()
+            )
+            self.NotAuthorized = client.exceptions.NotAuthorizedException
+            self.UsernameExists = client.exceptions.UsernameExistsException
+            self._cognito_client = client
+        return self._cognito_client
     
     def extract_user_from_event(self, event: Dict) -> Optional[str]:
         """
         Extract user ID from API Gateway event (after Cognito authorizer.
         
+        API Gateway has already verified the JWT, so this only reads the
+        claims it attached and never touches Cognito.
+        
         Args:
             event: Lambda event from API Gateway
         
@@ -65,7 +102,7 @@ class AuthService:
             response = self.cognito_client.get_user(AccessToken=token)
             return response.get("UserAttributes", {})
         
-        except self.cognito_client.exceptions.NotAuthorizedException:
+        except self.NotAuthorized:
             raise UnauthorizedError("Invalid or expired token")
         except Exception as e:
             error(f"Token validation failed: {str(e)}")
@@ -101,7 +138,7 @@ class AuthService:
                 "email": email
             }
         
-        except self.cognito_client.exceptions.UsernameExistsException:
+        except self.UsernameExists:
             raise UnauthorizedError("User already exists")
         except Exception as e:
             error(f"Signup failed: {str(e)}")
@@ -137,7 +174,7 @@ class AuthService:
                 "idToken": authentication_result.get("IdToken")
             }
         
-        except self.cognito_client.exceptions.NotAuthorizedException:
+        except self.NotAuthorized:
             raise UnauthorizedError("Invalid email or password")
         except Exception as e:
             error(f"Login failed: {str(e)}")
@@ -156,13 +193,24 @@ def get_auth_service() -> AuthService:
     return _auth_service
 
 
-def lambda_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _json_default(value):
+    """Serialize types orjson doesn't handle: DynamoDB Decimals as numbers, anything else as str."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def lambda_response(status_code: int, body: Union[Dict, str], headers: Dict = None) -> Dict:
     """
     Create a Lambda API Gateway response.
     
     Args:
         status_code: HTTP status code
-        body: Response body as dictionary
+        body: Response body as dictionary, or an already serialized JSON string
+            (e.g. from a response DTO's model_dump_json())
         headers: Optional custom headers
     
     Returns:
@@ -178,10 +226,13 @@ def lambda_response(status_code: int, body: Dict, headers: Dict = None) -> Dict:
     if headers:
         default_headers.update(headers)
     
+    if not isinstance(body, str):
+        body = orjson.dumps(body, default=_json_default, option=_JSON_OPTIONS).decode()
+    
     return {
         "statusCode": status_code,
         "headers": default_headers,
-        "body": json.dumps(body, default=str)
+        "body": body
     }
 
 
@@ -189,6 +240,9 @@ def lambda_handler_decorator(func):
     """Decorator for Lambda handlers with error handling."""
     @wraps(func)
     def wrapper(event, context):
+        # Log lines written straight to stdout have no runtime prefix, so the
+        # request id travels in the JSON instead
+        set_request_id(getattr(context, "aws_request_id", None))
         try:
             # Call the handler
             return func(event, context)
@@ -199,10 +253,36 @@ def lambda_handler_decorator(func):
         except Exception as e:
             error(f"Handler error in {func.__name__}: {str(e)}")
             return lambda_response(500, {"error": "Internal server error", "code": "INTERNAL_ERROR"})
+        
+        finally:
+            # Don't leave buffered log lines behind when the container freezes
+            flush_logs()
+            set_request_id(None)
     
     return wrapper
 
 
+def get_token_sub(id_token: str) -> Optional[str]:
+    """
+    Read the `sub` claim from a Cognito IdToken without a network call.
+    
+    The token is taken straight from InitiateAuth, so the payload is decoded
+    locally without signature verification.
+    
+    Args:
+        id_token: IdToken returned by Cognito
+    
+    Returns:
+        User ID (sub from JWT) or None if the token is missing or malformed
+    """
+    try:
+        payload = id_token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return claims.get("sub")
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
 def validate_trip_ownership(trip_state_user_id: str, requesting_user_id: str):
     """
     Validate that the requesting user owns the trip.
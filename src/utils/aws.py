@@ -0,0 +1,123 @@
+"""Shared AWS clients, created once per Lambda container and reused across invocations."""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from botocore.config import Config
+
+from src.config import AWS_REGION, PREWARM_CONNECTIONS
+
+# Keep connections to AWS endpoints open between invocations so warm
+# containers skip the TCP/TLS handshake on every DynamoDB call
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"mode": "standard"}
+)
+
+
+# boto3 sessions aren't safe for concurrent client creation, and fan-out
+# threads can race each other to the first client, so creation is serialized
+_session_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_session() -> "boto3.session.Session":
+    """Get the boto3 session shared by every client in this container."""
+    # boto3 is the largest import on cold start; modules that only reference
+    # these helpers (or never create a client) don't pay for it at import time
+    import boto3
+    return boto3.session.Session()
+
+
+def get_client(service_name: str, region: str = None, config: Config = None):
+    """
+    Get a cached low-level client from the shared session.
+    
+    Args:
+        service_name: AWS service name (e.g. "bedrock-runtime")
+        region: Region; defaults to AWS_REGION
+        config: botocore Config; defaults to BOTO_CONFIG
+    
+    Returns:
+        boto3 client
+    """
+    with _session_lock:
+        return _create_client(service_name, region or AWS_REGION, config or BOTO_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def _create_client(service_name: str, region: str, config: Config):
+    """Create a client; cached per (service, region, config)."""
+    return get_session().client(service_name, region_name=region, config=config)
+
+
+@lru_cache(maxsize=1)
+def get_ddb_resource():
+    """Get the shared DynamoDB resource, created on first use."""
+    with _session_lock:
+        return get_session().resource(
+            "dynamodb",
+            region_name=AWS_REGION,
+            config=BOTO_CONFIG
+        )
+
+
+@lru_cache(maxsize=None)
+def get_table(name: str):
+    """Get a cached DynamoDB Table resource by name."""
+    return get_ddb_resource().Table(name)
+
+
+@lru_cache(maxsize=1)
+def _get_serializer():
+    """Get the shared TypeSerializer, importing boto3 on first use."""
+    from boto3.dynamodb.types import TypeSerializer
+    return TypeSerializer()
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a resource-style item to low-level attribute values (e.g. for transactions)."""
+    serializer = _get_serializer()
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+
+def prewarm(*warmups: Callable[[], None]) -> None:
+    """
+    Run warmup callables during cold start.
+    
+    Handler modules call this at import so client creation and credential
+    loading happen during init instead of delaying the first request. They
+    run inline: Lambda freezes the environment once init ends, so a
+    background thread would mostly finish during some later invocation.
+    Failures are ignored; the request path creates whatever is still missing.
+    
+    Under SnapStart the INIT phase ends in a snapshot: connections opened
+    then are dead after restore, and a fetched secret would be baked into
+    every restored environment. The warmups run after restore instead.
+    
+    Args:
+        *warmups: Callables that open connections or load credentials
+    """
+    if not PREWARM_CONNECTIONS:
+        return
+    
+    def run():
+        for warmup in warmups:
+            try:
+                warmup()
+            except Exception:
+                pass
+    
+    if os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "snap-start":
+        try:
+            # Provided by the Lambda Python runtime when SnapStart is on
+            from snapshot_restore_py import register_after_restore
+        except ImportError:
+            return
+        register_after_restore(run)
+        return
+    
+    run()
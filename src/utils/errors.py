@@ -2,55 +2,95 @@
 
 
 class BaseAppError(Exception):
-    """Base exception for all application errors."""
+    """
+    Base exception for all application errors.
     
-    def __init__(self, message: str, code: str = "ERROR", status_code: int = 500):
+    Subclasses declare their code and status_code as class attributes;
+    an instance only stores them when the caller overrides the defaults.
+    Instance fields are slots; BaseException still gives every instance a
+    __dict__, which is where those overrides land.
+    """
+    
+    __slots__ = ("message",)
+    
+    code = "ERROR"
+    status_code = 500
+    
+    def __init__(self, message: str, code: str = None, status_code: int = None):
         self.message = message
-        self.code = code
-        self.status_code = status_code
-        super().__init__(self.message)
+        if code is not None:
+            self.code = code
+        if status_code is not None:
+            self.status_code = status_code
+        super().__init__(message)
 
 
 class ValidationError(BaseAppError):
     """Raised when request validation fails."""
     
+    __slots__ = ("details",)
+    
+    code = "VALIDATION_ERROR"
+    status_code = 400
+    
     def __init__(self, message: str, details: dict = None):
-        super().__init__(message, "VALIDATION_ERROR", 400)
+        super().__init__(message)
         self.details = details or {}
 
 
 class NotFoundError(BaseAppError):
     """Raised when a resource is not found."""
     
+    __slots__ = ()
+    
+    code = "NOT_FOUND"
+    status_code = 404
+    
     def __init__(self, message: str = "Resource not found"):
-        super().__init__(message, "NOT_FOUND", 404)
+        super().__init__(message)
 
 
 class UnauthorizedError(BaseAppError):
     """Raised when authentication/authorization fails."""
     
+    __slots__ = ()
+    
+    code = "UNAUTHORIZED"
+    status_code = 401
+    
     def __init__(self, message: str = "Unauthorized"):
-        super().__init__(message, "UNAUTHORIZED", 401)
+        super().__init__(message)
 
 
 class ExternalServiceError(BaseAppError):
     """Raised when external service call fails."""
     
-    def __init__(self, message: str, service: str = "EXTERNAL_SERVICE"):
-        super().__init__(message, f"{service}_ERROR", 502)
+    __slots__ = ()
+    
+    code = "EXTERNAL_SERVICE_ERROR"
+    status_code = 502
+    
+    def __init__(self, message: str, service: str = None):
+        super().__init__(message, f"{service}_ERROR" if service else None)
 
 
 class GeocodeError(ExternalServiceError):
     """Raised when geocoding fails."""
     
+    __slots__ = ()
+    
+    code = "GEOCODE_ERROR"
+    
     def __init__(self, message: str):
-        super().__init__(message, "GEOCODE")
+        super().__init__(message)
 
 
 class LLMError(ExternalServiceError):
     """Raised when LLM invocation fails."""
     
+    __slots__ = ()
+    
+    code = "LLM_ERROR"
+    
     def __init__(self, message: str):
-        super().__init__(message, "LLM")
-
-
+        super().__init__(message)
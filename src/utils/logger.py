@@ -1,15 +1,108 @@
 """Structured logging for CloudWatch."""
 
-import json
+import atexit
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import orjson
+from cachetools import LRUCache
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# In Lambda, CloudWatch ingests stdout as is, so lines are written there
+# directly instead of through the root logger's handler, formatter and lock.
+# The runtime's "[LEVEL] timestamp request-id" prefix is dropped; the JSON
+# carries level, timestamp and requestId instead. LOG_DIRECT_STDOUT=false
+# restores it.
+_DIRECT_STDOUT = (
+    os.getenv("AWS_LAMBDA_FUNCTION_NAME") is not None
+    and os.getenv("LOG_DIRECT_STDOUT", "true").lower() == "true"
+)
+
+# When set, direct stdout lines are collected and written in one call when
+# the handler returns (see flush_logs), when this many bytes are pending, or
+# at once for ERROR and above. Off by default: a timeout or OOM kill ends the
+# process before the handler returns, and whatever was buffered is lost.
+LOG_BUFFER_BYTES = int(os.getenv("LOG_BUFFER_BYTES", "0")) if _DIRECT_STDOUT else 0
+_log_buffer: List[str] = []
+_log_buffer_size = 0
+_log_buffer_lock = threading.Lock()
+
+# Level names used by the helpers below, resolved once instead of per call
+_LEVELS = {
+    name: getattr(logging, name)
+    for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+}
+
+# AWS request id of the invocation in progress, set by the handler decorator.
+# An environment runs one invocation at a time, so a module global is enough.
+# The pre-rendered field opens the requestId value and leaves its closing
+# quote to the level fields that follow it.
+_request_id: Optional[str] = None
+_request_id_field = ""
+
+# Non-string context keys are stringified like json.dumps did
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# (epoch second, its "YYYY-MM-DDTHH:MM:SS" rendering); lines logged in the same
+# second only format the microseconds. Replaced as one tuple, so threads never
+# see a mismatched pair.
+_last_second = (None, "")
+
+# Pre-rendered JSON between the timestamp and message values, per level name,
+# so lines without context are assembled by concatenation
+_LEVEL_FIELDS = {name: f'","level":"{name}","message":' for name in _LEVELS}
+
+# Common secret field names, matched exactly with one hash lookup before the
+# substring search; "authorization" (e.g. request headers) is only caught here
+_SECRET_KEYS = frozenset((
+    "key", "password", "secret", "token", "api_key", "apikey", "apiKey",
+    "accessToken", "refreshToken", "idToken", "authorization", "Authorization"
+))
+
+# Dict keys, and string values, that mark a secret ("api_key" is covered by "key")
+_SECRET_KEY_RE = re.compile(r"key|password|secret|token", re.IGNORECASE)
+_SECRET_VALUE_RE = re.compile(r"key|secret", re.IGNORECASE)
+_REDACTED = "***REDACTED***"
+
+# Redacted copies of small payloads, keyed by their JSON encoding, so bodies
+# logged again (retries, request/response echoes) skip the tree walk. Larger
+# payloads aren't cached: encoding them costs about as much as the walk.
+REDACT_CACHE_MAX_BYTES = 1024
+_redact_cache = LRUCache(maxsize=256)
+_redact_cache_lock = threading.Lock()
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as naive ISO8601 with microseconds, without building a datetime."""
+    global _last_second
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _last_second
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _last_second = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1e6):06d}"
+
+
+def set_request_id(request_id: Optional[str]) -> None:
+    """
+    Stamp subsequent log lines with an invocation's AWS request id.
+    
+    Args:
+        request_id: context.aws_request_id, or None to stop stamping
+    """
+    global _request_id, _request_id_field
+    _request_id = request_id
+    _request_id_field = '","requestId":' + orjson.dumps(request_id).decode()[:-1] if request_id else ""
+
 
 def log_event(level: str, message: str, context: Dict[str, Any] = None):
     """
@@ -20,66 +113,177 @@ def log_event(level: str, message: str, context: Dict[str, Any] = None):
         message: Log message
         context: Additional context dictionary
     """
-    log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "level": level,
-        "message": message,
-    }
+    level_no = _LEVELS.get(level) or _LEVELS.get(level.upper(), logging.INFO)
+    
+    # Skip building and serializing lines the logger would drop anyway
+    if logger.isEnabledFor(level_no):
+        _emit(level, level_no, message, context)
+
+
+def _emit(level: str, level_no: int, message: str, context: Optional[Dict[str, Any]]):
+    """Serialize and write one log line; the caller has checked the level is enabled."""
+    timestamp = _utc_timestamp()
+    
+    # Common case: only the message needs escaping
+    level_fields = _LEVEL_FIELDS.get(level)
+    if not context and level_fields is not None:
+        line = (
+            '{"timestamp":"' + timestamp + _request_id_field + level_fields
+            + orjson.dumps(message, default=str).decode() + "}"
+        )
+    else:
+        log_entry = {"timestamp": timestamp}
+        if _request_id:
+            log_entry["requestId"] = _request_id
+        log_entry["level"] = level
+        log_entry["message"] = message
+        
+        if context:
+            log_entry["context"] = context
+        
+        line = orjson.dumps(log_entry, default=str, option=_JSON_OPTIONS).decode()
     
-    if context:
-        log_entry["context"] = context
+    if not _DIRECT_STDOUT:
+        logger.log(level_no, line)
+    elif not LOG_BUFFER_BYTES:
+        # Flushed per line: a frozen container must not hold unwritten logs
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+    else:
+        global _log_buffer_size
+        with _log_buffer_lock:
+            _log_buffer.append(line + "\n")
+            _log_buffer_size += len(line) + 1
+            if level_no >= logging.ERROR or _log_buffer_size >= LOG_BUFFER_BYTES:
+                _flush_buffer()
+
+
+def _flush_buffer():
+    """Write out pending lines; the caller holds _log_buffer_lock."""
+    global _log_buffer_size
+    if _log_buffer:
+        sys.stdout.write("".join(_log_buffer))
+        sys.stdout.flush()
+        _log_buffer.clear()
+        _log_buffer_size = 0
+
+
+def flush_logs():
+    """
+    Write out buffered log lines.
     
-    logger.log(getattr(logging, level.upper(), logging.INFO), json.dumps(log_entry))
+    Called when a handler returns, so nothing is left pending while the
+    container is frozen between invocations.
+    """
+    with _log_buffer_lock:
+        _flush_buffer()
+
+
+atexit.register(flush_logs)
 
 
 def info(message: str, context: Dict[str, Any] = None):
     """Log info level message."""
-    log_event("INFO", message, context)
+    if logger.isEnabledFor(logging.INFO):
+        _emit("INFO", logging.INFO, message, context)
 
 
 def warning(message: str, context: Dict[str, Any] = None):
     """Log warning level message."""
-    log_event("WARNING", message, context)
+    if logger.isEnabledFor(logging.WARNING):
+        _emit("WARNING", logging.WARNING, message, context)
 
 
 def error(message: str, context: Dict[str, Any] = None):
     """Log error level message."""
-    log_event("ERROR", message, context)
+    if logger.isEnabledFor(logging.ERROR):
+        _emit("ERROR", logging.ERROR, message, context)
 
 
 def debug(message: str, context: Dict[str, Any] = None):
     """Log debug level message."""
-    log_event("DEBUG", message, context)
+    if logger.isEnabledFor(logging.DEBUG):
+        _emit("DEBUG", logging.DEBUG, message, context)
 
 
 def redact_secrets(value: Any) -> Any:
     """
     Redact secrets from logs.
     
+    Small JSON payloads are memoized, so the returned containers may be
+    shared between calls and must be treated as read-only.
+    
     Args:
         value: Value to redact
     
     Returns:
         Redacted value
     """
+    if not isinstance(value, (dict, list)):
+        return _redact(value)
+    
+    try:
+        cache_key = orjson.dumps(value)
+    except TypeError:
+        # Not plain JSON (e.g. Decimals, non-string keys); walk it uncached
+        return _redact(value)
+    
+    if len(cache_key) > REDACT_CACHE_MAX_BYTES:
+        return _redact(value)
+    
+    with _redact_cache_lock:
+        redacted = _redact_cache.get(cache_key)
+    if redacted is None:
+        redacted = _redact(value)
+        with _redact_cache_lock:
+            _redact_cache[cache_key] = redacted
+    return redacted
+
+
+def _redact(value: Any) -> Any:
+    """
+    Redact secrets from a value without the cache.
+    
+    Nested dicts and lists are copied with an explicit work stack rather than
+    recursion, so deep payloads cost no call frame per node.
+    """
     if isinstance(value, dict):
-        redacted = {}
-        for k, v in value.items():
-            if any(secret in k.lower() for secret in ["key", "password", "secret", "token", "api_key"]):
-                redacted[k] = "***REDACTED***"
-            else:
-                redacted[k] = redact_secrets(v)
-        return redacted
+        root = {}
     elif isinstance(value, list):
-        return [redact_secrets(item) for item in value]
-    elif isinstance(value, str) and any(secret in value.lower() for secret in ["key", "secret"]):
-        return "***REDACTED***"
+        root = [None] * len(value)
+    elif isinstance(value, str) and _SECRET_VALUE_RE.search(value):
+        return _REDACTED
     else:
         return value
+    
+    # (source container, its copy); each copy is filled when popped
+    stack = [(value, root)]
+    while stack:
+        source, target = stack.pop()
+        is_dict = isinstance(source, dict)
+        
+        for k, v in (source.items() if is_dict else enumerate(source)):
+            if is_dict and (k in _SECRET_KEYS or _SECRET_KEY_RE.search(k)):
+                target[k] = _REDACTED
+            elif isinstance(v, dict):
+                target[k] = child = {}
+                stack.append((v, child))
+            elif isinstance(v, list):
+                target[k] = child = [None] * len(v)
+                stack.append((v, child))
+            elif isinstance(v, str) and _SECRET_VALUE_RE.search(v):
+                target[k] = _REDACTED
+            else:
+                target[k] = v
+    
+    return root
 
 
 def log_request(method: str, path: str, body: Dict = None):
     """Log incoming request."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     context = {"method": method, "path": path}
     if body:
         context["body"] = redact_secrets(body)
@@ -88,6 +292,9 @@ def log_request(method: str, path: str, body: Dict = None):
 
 def log_response(status_code: int, body: Dict = None):
     """Log outgoing response."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     context = {"status_code": status_code}
     if body:
         context["body"] = redact_secrets(body)
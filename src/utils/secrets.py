@@ -1,60 +1,134 @@
 """AWS Secrets Manager client."""
 
-import json
 import os
-import boto3
-from typing import Dict, Optional
+import threading
+import orjson
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError
 
+from src.utils.aws import get_client
 from src.utils.logger import error, info
 
 
+# Log message prefix per GetSecretValue error code
+_SECRET_ERROR_MESSAGES = {
+    "ResourceNotFoundException": "Secret not found",
+    "InvalidRequestException": "Invalid request for secret",
+    "InvalidParameterException": "Invalid parameter for secret",
+    "DecryptionFailureException": "Failed to decrypt secret",
+    "InternalServiceErrorException": "Internal AWS error for secret",
+}
+
+# GetSecretValue is one network round trip per secret, so bulk fetches fan out
+SECRETS_MAX_WORKERS = 8
+
+# Secret strings already fetched by this container. The TTL bounds how long a
+# rotated secret can stay stale in a warm container.
+SECRET_CACHE_TTL_SECONDS = 300
+_secret_cache = TTLCache(maxsize=1024, ttl=SECRET_CACHE_TTL_SECONDS)
+_secret_cache_lock = threading.Lock()
+
+
+def _get_cached_secret(secret_name: str) -> Optional[str]:
+    """Look up a secret string fetched within the TTL."""
+    with _secret_cache_lock:
+        return _secret_cache.get(secret_name)
+
+
+def _cache_secret(secret_name: str, secret_value: str) -> None:
+    """Remember a fetched secret string."""
+    with _secret_cache_lock:
+        _secret_cache[secret_name] = secret_value
+
+
 class SecretsManager:
-    """Client for retrieving secrets from AWS Secrets Manager."""
+    """
+    Client for retrieving secrets from AWS Secrets Manager.
+    
+    The module-level instance from get_secrets_manager() lives as long as the
+    container, so warm invocations hit the secret cache instead of the API.
+    """
     
     def __init__(self, region: str = None):
         self.region = region or os.getenv("AWS_REGION", "us-west-2")
-        self.client = boto3.client("secretsmanager", region_name=self.region)
-        self._cache: Dict[str, str] = {}
+        self.inrix_secret_arn = os.getenv("INRIX_SECRET_ARN")
+        self._client = None
+        # secret name -> (secret string, parsed JSON); reused while the cache
+        # keeps returning the same string, reparsed once it is refetched
+        self._json_cache: Dict[str, Tuple[str, Dict]] = {}
+    
+    @property
+    def client(self):
+        """Secrets Manager client, created on first use."""
+        # Containers that take the INRIX_API_KEY env fallback, or only hit the
+        # cache, never build it (and never import boto3 for it)
+        if self._client is None:
+            self._client = get_client("secretsmanager", self.region)
+        return self._client
     
     def get_secret(self, secret_name: str) -> Optional[str]:
         """
         Retrieve a secret from Secrets Manager with caching.
         
+        Values are reused for SECRET_CACHE_TTL_SECONDS, then fetched again so
+        rotations are picked up without recycling the container.
+        
         Args:
             secret_name: Name or ARN of the secret
         
         Returns:
             Secret value or None if not found
         """
-        if secret_name in self._cache:
-            return self._cache[secret_name]
+        cached = _get_cached_secret(secret_name)
+        if cached is not None:
+            return cached
         
         try:
             response = self.client.get_secret_value(SecretId=secret_name)
             secret_value = response["SecretString"]
             
             # Cache for future use
-            self._cache[secret_name] = secret_value
+            _cache_secret(secret_name, secret_value)
             info(f"Retrieved secret: {secret_name}")
             return secret_value
         
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code", "Unknown")
-            if error_code == "ResourceNotFoundException":
-                error(f"Secret not found: {secret_name}")
-            elif error_code == "InvalidRequestException":
-                error(f"Invalid request for secret: {secret_name}")
-            elif error_code == "InvalidParameterException":
-                error(f"Invalid parameter for secret: {secret_name}")
-            elif error_code == "DecryptionFailureException":
-                error(f"Failed to decrypt secret: {secret_name}")
-            elif error_code == "InternalServiceErrorException":
-                error(f"Internal AWS error for secret: {secret_name}")
+            message = _SECRET_ERROR_MESSAGES.get(error_code)
+            if message is not None:
+                error(f"{message}: {secret_name}")
             else:
                 error(f"Error retrieving secret {secret_name}: {str(e)}")
             return None
     
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve several secrets concurrently.
+        
+        Cached secrets are returned directly; the rest are fetched in parallel,
+        so the call costs about one round trip instead of one per secret.
+        
+        Args:
+            secret_names: Names or ARNs of the secrets
+        
+        Returns:
+            Dictionary of secret name -> value, None where retrieval failed
+        """
+        results = {name: _get_cached_secret(name) for name in secret_names}
+        missing = [name for name, value in results.items() if value is None]
+        
+        if len(missing) == 1:
+            results[missing[0]] = self.get_secret(missing[0])
+        elif missing:
+            # Build the client before fanning out so threads don't race to create it
+            self.client
+            with ThreadPoolExecutor(max_workers=min(SECRETS_MAX_WORKERS, len(missing))) as executor:
+                results.update(zip(missing, executor.map(self.get_secret, missing)))
+        
+        return results
+    
     def get_json_secret(self, secret_name: str) -> Dict:
         """
         Retrieve a JSON secret and parse it.
@@ -69,20 +143,26 @@ class SecretsManager:
         if not secret_value:
             return {}
         
+        parsed = self._json_cache.get(secret_name)
+        if parsed is not None and parsed[0] is secret_value:
+            return parsed[1]
+        
         try:
-            return json.loads(secret_value)
-        except json.JSONDecodeError as e:
+            secret_json = orjson.loads(secret_value)
+        except orjson.JSONDecodeError as e:
             error(f"Failed to parse JSON secret {secret_name}: {str(e)}")
             return {}
+        
+        self._json_cache[secret_name] = (secret_value, secret_json)
+        return secret_json
     
     def get_inrix_api_key(self) -> Optional[str]:
         """Get INRIX API key from Secrets Manager."""
-        secret_arn = os.getenv("INRIX_SECRET_ARN")
-        if not secret_arn:
+        if not self.inrix_secret_arn:
             error("INRIX_SECRET_ARN not set in environment")
             return None
         
-        secret_json = self.get_json_secret(secret_arn)
+        secret_json = self.get_json_secret(self.inrix_secret_arn)
         return secret_json.get("INRIX_API_KEY") or os.getenv("INRIX_API_KEY")
 
 